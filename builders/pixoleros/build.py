@@ -60,6 +60,7 @@ print("ROOT", ROOT, args.build_directory)
 venv_name = 'pixoleros_venv'
 HERE = os.path.dirname(__file__)
 PIXOLEROS_ROOT = f'{HERE}/../../sdk/pixoleros'
+RAGTIMERUMBLE_ROOT = f'{HERE}/../../ragtimerumble'
 
 # Build venv and install/copy dependencies
 requirement_paths = [f'{HERE}/requirements.txt']
@@ -137,6 +138,13 @@ lib_directory = f'{ROOT}/{name}/lib'
 shutil.copytree(
     f'{PIXOLEROS_ROOT}/pixoleros',
     f'{lib_directory}/pixoleros')
+# The palette swap is shared with the game, only its numpy module is
+# shipped.
+os.makedirs(f'{lib_directory}/ragtimerumble')
+for filename in ('__init__.py', 'palette.py'):
+    shutil.copy(
+        f'{RAGTIMERUMBLE_ROOT}/ragtimerumble/{filename}',
+        f'{lib_directory}/ragtimerumble/{filename}')
 
 
 
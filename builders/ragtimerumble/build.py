@@ -80,7 +80,6 @@ build_number = f'{datetime.datetime.now():%y-%m-%d_%H-%M-%S}'
 # Config cx_Freeze includes.
 includes = [
     'json',
-    'matplotlib',
     'msgpack',
     'pygame',]
 
@@ -1,16 +1,20 @@
 import sys
-import pickle
+import time
 import pygame
 
 import os
 sys.path.append(f'{os.path.dirname(__file__)}/..')
 
-from ragtimerumble.io import load_skins, load_main_resources
-from ragtimerumble.config import DISPLAY_MODES, LOOP_STATUSES
+from ragtimerumble import preferences
+from ragtimerumble.io import load_skins, load_main_resources, sounds_report
+from ragtimerumble.config import DISPLAY_MODES, LOOP_STATUSES, GAMETYPES
 from ragtimerumble.display import set_screen_display_mode, get_screen
 from ragtimerumble.gameloop import GameLoop
-from ragtimerumble.render import render_game
+from ragtimerumble.render import render_game, render_profiler, SURFACE_POOL
+from ragtimerumble.replay import load_replay, save_replay
+from ragtimerumble.telemetry import TelemetryWriter
 from ragtimerumble import debug
+from ragtimerumble import profiler
 
 import argparse
 
@@ -18,45 +22,113 @@ parser = argparse.ArgumentParser()
 parser.add_argument('-ds', '--default_scene', type=str, default=None)
 parser.add_argument('-lods', '--loop_on_default_scene', action='store_true', default=False)
 parser.add_argument('-w', '--windowed', action='store_true', default=False)
-parser.add_argument('-ufps', '--unlocked_fps', action='store_true', default=False)
-parser.add_argument('-r', '--record_replay_filepath', type=str)
+parser.add_argument(
+    '-ufps', '--unlocked_fps', action='store_true', default=False,
+    help='Render as fast as possible, the simulation keeps its fixed step.')
+parser.add_argument(
+    '-r', '--record_replay_filepath', type=str,
+    help='Record the characters states of the battles (telemetry file).')
+parser.add_argument(
+    '-ri', '--record_inputs_filepath', type=str, default=None,
+    help='Record the seed and the inputs of every round played.')
+parser.add_argument(
+    '-pi', '--play_inputs_filepath', type=str, default=None,
+    help='Re-simulate the rounds recorded with --record_inputs_filepath.')
+parser.add_argument(
+    '-sd', '--seed', type=int, default=None,
+    help='Seed of the rounds random generators.')
+parser.add_argument(
+    '-hl', '--headless', type=int, default=None, metavar='TICKS',
+    help='Run TICKS battle ticks without window, sound device nor fps cap.')
+parser.add_argument('-nr', '--no_render', action='store_true', default=False)
+parser.add_argument('-gt', '--gametype', choices=GAMETYPES, default=None)
+parser.add_argument(
+    '-lzs', '--lazy_skins', action='store_true', default=False,
+    help='Load the skins at first use instead of at startup.')
+parser.add_argument(
+    '-pf', '--profile_filepath', type=str, default=None,
+    help='Time the frames subsystems and save a chrome://tracing json.')
 
 arguments = parser.parse_args()
+headless = (
+    arguments.headless is not None or
+    arguments.play_inputs_filepath is not None)
+
+if headless:
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+if arguments.profile_filepath or debug.profiler_overlay:
+    profiler.enable()
+if arguments.gametype:
+    preferences.set('gametype', arguments.gametype)
 
 pygame.init()
-set_screen_display_mode(
-    DISPLAY_MODES.SCALED if arguments.windowed else DISPLAY_MODES.FULLSCREEN)
+if headless:
+    set_screen_display_mode(DISPLAY_MODES.WINDOWED)
+else:
+    set_screen_display_mode(
+        DISPLAY_MODES.SCALED if arguments.windowed else DISPLAY_MODES.FULLSCREEN)
 pygame.joystick.init()
-load_skins()
+if not arguments.lazy_skins:
+    load_skins()
 load_main_resources()
 loop = GameLoop(
     unlocked_fps=arguments.unlocked_fps,
     default_scene=arguments.default_scene,
-    loop_on_default_scene=arguments.loop_on_default_scene)
+    loop_on_default_scene=arguments.loop_on_default_scene,
+    headless=headless,
+    seed=arguments.seed,
+    record_replay=arguments.record_inputs_filepath is not None,
+    replay=(
+        load_replay(arguments.play_inputs_filepath)
+        if arguments.play_inputs_filepath else None))
 
 loop.set_scene(next(loop.scenes_iterator))
+if headless and not arguments.play_inputs_filepath:
+    loop.start_headless()
 
-replay = []
+telemetry = (
+    TelemetryWriter(arguments.record_replay_filepath)
+    if arguments.record_replay_filepath else None)
+ticks = 0
+start_time = time.perf_counter()
 while not loop.done:
-    next(loop)
-    if arguments.record_replay_filepath and loop.status == LOOP_STATUSES.BATTLE:
-        try:
-            positions = [
-                (c.coordinates.position, c.status, c.pilot is None)
-                for c in loop.scene.characters]
-            replay.append(positions)
-        except TypeError:
-            positions = [c.coordinates.position for c in loop.scene.characters]
-            exit()
-    render_game(get_screen(), loop)
-    pygame.display.update()
-    if debug.log_coordinates:
-        debug.log_npc_coordinates(loop.scene)
-
-if replay:
-    with open(arguments.record_replay_filepath, 'wb') as f:
-        pickle.dump(replay, f)
+    for _ in loop.steps():
+        if telemetry and loop.status == LOOP_STATUSES.BATTLE:
+            telemetry.record(ticks, loop.scene.characters)
+        if debug.log_coordinates:
+            debug.log_npc_coordinates(loop.scene, ticks)
+        ticks += 1
+    if not arguments.no_render:
+        with profiler.scope('render'):
+            render_game(get_screen(), loop)
+        if debug.profiler_overlay:
+            render_profiler(get_screen())
+        with profiler.scope('display.update'):
+            pygame.display.update()
+    profiler.next_frame()
+    if arguments.headless is not None and ticks >= arguments.headless:
+        break
+
+if headless:
+    elapsed = time.perf_counter() - start_time
+    print(
+        f'{ticks} ticks in {elapsed:.2f}s '
+        f'({ticks / elapsed:.1f} ticks/s) on {loop.scene_path}')
+    if not arguments.no_render:
+        print(SURFACE_POOL.report())
+    print(sounds_report())
+    if profiler.enabled:
+        print(profiler.report())
+
+if telemetry:
+    telemetry.close()
+
+if arguments.record_inputs_filepath:
+    save_replay(arguments.record_inputs_filepath, loop.recorded_rounds)
+
+if arguments.profile_filepath:
+    profiler.dump_trace(arguments.profile_filepath)
 
 debug.close()
 sys.exit(0)
-
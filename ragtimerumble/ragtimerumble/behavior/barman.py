@@ -1,4 +1,3 @@
-import random
 import itertools
 
 from ragtimerumble.config import COUNTDOWNS, DIRECTIONS
@@ -13,13 +12,14 @@ class Barman:
 
     def __init__(
             self, file=None, startposition=None,
-            path=None, direction=None, blendmode='normal', **_):
+            path=None, direction=None, blendmode='normal', scene=None, **_):
         self.data = load_data(file)
+        self.scene = scene
         self.blendmode = blendmode
         self.direction = direction or DIRECTIONS.LEFT
-        self.spritesheet = SpriteSheet(self.data, 'idle')
+        self.spritesheet = SpriteSheet(file, 'idle', scene.random)
         self.coordinates = Coordinates((startposition))
-        self.idle_cooldown = random.randint(
+        self.idle_cooldown = self.scene.random.randint(
             *COUNTDOWNS.BARMAN_IDLE_COOLDOWN_RANGE)
         self.walk_cooldown = 0
         self.path = itertools.cycle(path)
@@ -85,20 +85,20 @@ class Barman:
             if not self.spritesheet.animation_is_done:
                 next(self.spritesheet)
                 return
-            self.idle_cooldown = random.randint(
+            self.idle_cooldown = self.scene.random.randint(
                 *COUNTDOWNS.BARMAN_IDLE_COOLDOWN_RANGE)
             self.spritesheet.animation = 'towel'
             self.spritesheet.index = 0
             return
 
         # Set new behavior
-        match random.choice(('towel', 'idle', 'walk')):
+        match self.scene.random.choice(('towel', 'idle', 'walk')):
             case 'towel':
                 self.spritesheet.animation = 'towel-start'
                 self.spritesheet.index = 0
                 return
             case 'idle':
-                self.idle_cooldown = random.randint(
+                self.idle_cooldown = self.scene.random.randint(
                     *COUNTDOWNS.BARMAN_IDLE_COOLDOWN_RANGE)
                 self.spritesheet.animation = 'idle'
                 self.spritesheet.index = 0
@@ -106,7 +106,7 @@ class Barman:
             case 'walk':
                 self.spritesheet.animation = 'walk'
                 self.spritesheet.index = 0
-                self.walk_cooldown = random.randint(
+                self.walk_cooldown = self.scene.random.randint(
                     *COUNTDOWNS.BARMAN_WALK_COOLDOWN_RANGE)
 
         next(self.spritesheet)
@@ -37,7 +37,7 @@ class Chicken:
         self.data = load_data(file)
         self.blendmode = blendmode
         self.scene = scene
-        self.spritesheet = SpriteSheet(self.data, 'idle-a')
+        self.spritesheet = SpriteSheet(file, 'idle-a', scene.random)
         self.startposition = startposition
         self.coordinates = Coordinates((startposition))
         self.run_radius = run_radius
@@ -87,7 +87,8 @@ class Chicken:
         v = set_vector_length([x, y], self.run_radius)
         dst = self.startposition[0] - v[0], self.startposition[1] - v[1]
 
-        self.path = iter(shortest_path(self.coordinates.position, dst))
+        self.path = iter(shortest_path(
+            self.coordinates.position, dst, self.scene.random))
         self.spritesheet.animation = 'runcycle'
         self.coordinates.round()
         self.destination = next(self.path)
@@ -105,7 +106,7 @@ class Chicken:
 
         if self.spritesheet.animation in self.IDLE_ANIMATIONS:
             if self.spritesheet.animation_is_done:
-                continue_idle = choose({True: 4, False: 1})
+                continue_idle = choose({True: 4, False: 1}, self.scene.random)
                 if continue_idle:
                     return self.set_idle()
                 return self.start_walk()
@@ -113,8 +114,9 @@ class Chicken:
             self.walk()
 
     def start_walk(self):
-        dst = random_position_in_rect(self.zone)
-        self.path = iter(shortest_path(self.coordinates.position, dst))
+        dst = random_position_in_rect(self.zone, rng=self.scene.random)
+        self.path = iter(shortest_path(
+            self.coordinates.position, dst, self.scene.random))
         self.spritesheet.animation = 'walkcycle'
         self.coordinates.round()
         self.destination = next(self.path)
@@ -159,7 +161,7 @@ class Chicken:
         possible_animations = {
             k: v for k, v in self.IDLE_ANIMATIONS.items()
             if k != self.spritesheet.animation}
-        animation = choose(possible_animations)
+        animation = choose(possible_animations, self.scene.random)
         sound = self.ANIMATION_SOUNDS.get(animation)
         # if sound:
         #     play_sound(sound)
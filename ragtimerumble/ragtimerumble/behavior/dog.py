@@ -1,5 +1,4 @@
 import sys
-import random
 import itertools
 
 from ragtimerumble.config import (
@@ -18,9 +17,9 @@ class Dog:
         self.data = load_data(file)
         self.scene = scene
         self.blendmode = blendmode
-        self.spritesheet = SpriteSheet(self.data, 'sit')
+        self.spritesheet = SpriteSheet(file, 'sit', scene.random)
         self.coordinates = Coordinates((startposition))
-        self.behavior_cooldown = random.randint(
+        self.behavior_cooldown = self.scene.random.randint(
             *COUNTDOWNS.DOG_IDLE_COOLDOWN_RANGE)
         self.path = itertools.cycle(path)
         self.destination = next(self.path)
@@ -115,15 +114,15 @@ class Dog:
             return
 
         if self.behavior_cooldown == 0 and animation == 'siderun':
-            self.behavior_cooldown = random.randint(
+            self.behavior_cooldown = self.scene.random.randint(
                 *COUNTDOWNS.DOG_IDLE_COOLDOWN_RANGE)
-            self.spritesheet.animation = random.choice(idles)
+            self.spritesheet.animation = self.scene.random.choice(idles)
             self.spritesheet.index = 0
             next(self.spritesheet)
             return
 
         if self.behavior_cooldown == 0 and animation in idles:
-            self.behavior_cooldown = random.randint(
+            self.behavior_cooldown = self.scene.random.randint(
                 *COUNTDOWNS.DOG_WALK_COOLDOWN_RANGE)
             self.spritesheet.animation = 'siderun'
             self.spritesheet.index = 0
@@ -134,7 +133,8 @@ class Dog:
             if not self.spritesheet.animation_is_done:
                 next(self.spritesheet)
                 return
-            self.spritesheet.animation = random.choice(('sit', 'idle'))
+            self.spritesheet.animation = self.scene.random.choice(
+                ('sit', 'idle'))
             self.spritesheet.index = 0
 
         next(self.spritesheet)
@@ -1,4 +1,3 @@
-import random
 from ragtimerumble.io import load_data, play_sound
 from ragtimerumble.sprite import SpriteSheet
 from ragtimerumble.config import COUNTDOWNS, DIRECTIONS, SPEED
@@ -18,11 +17,11 @@ class Ghost:
         self.speed = SPEED.GHOST_MIN
         self.startposition = startposition
         self.coordinates = Coordinates((startposition))
-        self.spritesheet = SpriteSheet(self.data, 'idle')
+        self.spritesheet = SpriteSheet(file, 'idle', scene.random)
         self.direction = direction or DIRECTIONS.LEFT
         self.blendmode = blendmode
         self.destination = None
-        self.walk_cooldown = random.choice(
+        self.walk_cooldown = self.scene.random.choice(
             range(COUNTDOWNS.GHOST_WALK_COUNT_DOWN_MIN,
                   COUNTDOWNS.GHOST_WALK_COUNT_DOWN_MAX))
 
@@ -41,12 +40,14 @@ class Ghost:
 
     def start_walk(self):
         self.coordinates.round()
-        dst = random_position_in_rect(self.zone, self.coordinates.position)
-        self.path = iter(shortest_path(self.coordinates.position, dst))
+        dst = random_position_in_rect(
+            self.zone, self.coordinates.position, self.scene.random)
+        self.path = iter(shortest_path(
+            self.coordinates.position, dst, self.scene.random))
         self.spritesheet.animation = 'walk'
         self.destination = next(self.path)
         self.spritesheet.index = 1
-        self.speed = random.choice(
+        self.speed = self.scene.random.choice(
             range(int(SPEED.GHOST_MIN * 100),
                   int(SPEED.GHOST_MAX * 100))) / 100
         self.walk()
@@ -67,7 +68,7 @@ class Ghost:
         if distance(p1, self.destination) < distance(p2, self.destination):
             self.spritesheet.animation = 'idle'
             self.spritesheet.index = 0
-            self.walk_cooldown = random.choice(
+            self.walk_cooldown = self.scene.random.choice(
                 range(COUNTDOWNS.GHOST_WALK_COUNT_DOWN_MIN,
                     COUNTDOWNS.GHOST_WALK_COUNT_DOWN_MAX))
 
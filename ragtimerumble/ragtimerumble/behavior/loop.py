@@ -5,11 +5,11 @@ from ragtimerumble.sprite import SpriteSheet
 
 
 class Loop:
-    def __init__(self, file, position, switch, blendmode, **_):
+    def __init__(self, file, position, switch, blendmode, scene, **_):
         self.data = load_data(file)
         self.switch = switch
         self.blendmode = blendmode
-        self.spritesheet = SpriteSheet(self.data, 'loop')
+        self.spritesheet = SpriteSheet(file, 'loop', scene.random)
         self.coordinates = Coordinates((position))
 
     @property
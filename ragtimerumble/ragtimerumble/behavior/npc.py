@@ -1,5 +1,4 @@
 import sys
-import random
 import itertools
 
 from ragtimerumble.config import (
@@ -25,9 +24,9 @@ class Npc:
         self.blendmode = 'normal'
         self.scene = scene
         self.next_duel_check_countdown = self.get_next_duel_check_countdown()
-        self.coma_count_down = random.randrange(
+        self.coma_count_down = self.scene.random.randrange(
             COUNTDOWNS.COMA_MIN, COUNTDOWNS.COMA_MAX)
-        self.interaction_cooldown = random.randrange(
+        self.interaction_cooldown = self.scene.random.randrange(
             COUNTDOWNS.INTERACTION_COOLDOWN_MIN,
             COUNTDOWNS.INTERACTION_COOLDOWN_MAX)
         self.interaction_loop_cooldown = 0
@@ -45,7 +44,7 @@ class Npc:
         self.character.request_duel()
 
         self.next_duel_check_countdown = self.get_next_duel_check_countdown()
-        self.release_time = random.randrange(
+        self.release_time = self.scene.random.randrange(
             COUNTDOWNS.DUEL_RELEASE_TIME_MIN,
             COUNTDOWNS.DUEL_RELEASE_TIME_MAX)
         return True
@@ -54,7 +53,7 @@ class Npc:
         chr_num = self.scene.alive_character_number
         minimum = COUNTDOWNS.DUEL_RELEASE_TIME_MIN * (chr_num / 10)
         maximum = COUNTDOWNS.DUEL_RELEASE_TIME_MAX * (chr_num / 2)
-        return random.randrange(int(minimum), int(maximum))
+        return self.scene.random.randrange(int(minimum), int(maximum))
 
     def release_target(self):
         target = self.character.duel_target
@@ -88,7 +87,8 @@ class Npc:
         condition = (
             (zone := self.character.attraction_zone()) and
             self.interaction_cooldown == 0 and
-            random.choice(range(COUNTDOWNS.INTERACTION_PROBABILITY)) == 0)
+            self.scene.random.randrange(
+                COUNTDOWNS.INTERACTION_PROBABILITY) == 0)
         if condition:
             return zone
 
@@ -101,18 +101,18 @@ class Npc:
 
         if self.is_cooling_down is False:
             proba = COUNTDOWNS.COOLDOWN_PROBABILITY
-            do_pause = random.randrange(0, proba) == 0
+            do_pause = self.scene.random.randrange(0, proba) == 0
             if do_pause:
                 self.character.pilot = None
                 self.is_cooling_down = True
-                self.cool_down = random.randrange(
+                self.cool_down = self.scene.random.randrange(
                     COUNTDOWNS.COOLDOWN_MIN, COUNTDOWNS.COOLDOWN_MAX)
                 next(self.character)
                 return
 
         if zone := self.interaction_zone():
             self.character.go_to(zone.target, zone)
-            self.interaction_cooldown = random.randrange(
+            self.interaction_cooldown = self.scene.random.randrange(
                 COUNTDOWNS.INTERACTION_COOLDOWN_MIN,
                 COUNTDOWNS.INTERACTION_COOLDOWN_MAX)
             next(self.character)
@@ -139,7 +139,7 @@ class Npc:
         next(self.character)
 
     def look_for_hard_path(self):
-        if not random.choice(range(HARD_PATH_USAGE_PROBABILITY)):
+        if not self.scene.random.choice(range(HARD_PATH_USAGE_PROBABILITY)):
             return None
         position = self.character.coordinates.position
         paths = filter_close_paths(
@@ -147,29 +147,32 @@ class Npc:
             HARD_PATH_SELECTION_RADIUS)
         if not paths:
             return
-        path = random.choice(paths)
-        pre_path = shortest_path(self.character.coordinates.position, path[0])
+        path = self.scene.random.choice(paths)
+        pre_path = shortest_path(
+            self.character.coordinates.position, path[0], self.scene.random)
         return pre_path + path
 
     def build_path(self):
         position = self.character.coordinates.position
 
-        if random.choice(range(SMOOTH_PATH_USAGE_PROBABILITY)) == 0:
+        if self.scene.random.choice(range(SMOOTH_PATH_USAGE_PROBABILITY)) == 0:
             paths = filter_close_paths(
                 position, self.scene.smooth_paths,
                 SMOOTH_PATH_SELECTION_RADIUS)
             if paths:
-                return smooth_path_to_path(position, random.choice(paths))
+                return smooth_path_to_path(
+                    position, self.scene.random.choice(paths),
+                    self.scene.random)
 
         functions = [shortest_path] * 2 + [equilateral_path]
-        func = random.choice(functions)
+        func = self.scene.random.choice(functions)
         box = self.character.box
         destination = choice_destination(self.scene, position, box)
-        path = func(position, destination)
+        path = func(position, destination, self.scene.random)
         for stair in self.scene.stairs:  # Avoid smooth path in stairs.
             if path_cross_rect(path, stair['zone']):
                 return self.build_path()
-        return func(position, destination)
+        return func(position, destination, self.scene.random)
 
     def __next__(self):
         if self.coma_count_down == 0:
@@ -180,9 +183,10 @@ class Npc:
             case CHARACTER_STATUSES.INTERACTING:
                 if self.interaction_loop_cooldown <= 0:
                     self.character.set_free()
-                    self.interaction_loop_cooldown = random.choice(range(
-                        COUNTDOWNS.INTERACTION_LOOP_COOLDOWN_MIN,
-                        COUNTDOWNS.INTERACTION_LOOP_COOLDOWN_MAX))
+                    self.interaction_loop_cooldown = self.scene.random.choice(
+                        range(
+                            COUNTDOWNS.INTERACTION_LOOP_COOLDOWN_MIN,
+                            COUNTDOWNS.INTERACTION_LOOP_COOLDOWN_MAX))
                     return
                 self.interaction_loop_cooldown -= 1
                 next(self.character)
@@ -1,4 +1,3 @@
-import random
 
 from ragtimerumble.coordinates import Coordinates
 from ragtimerumble.io import load_data
@@ -17,10 +16,13 @@ class Pianist:
         'fast3',
         'fast4']
 
-    def __init__(self, file='', startposition=None, blendmode='normal', **_):
+    def __init__(
+            self, file='', startposition=None, blendmode='normal', scene=None,
+            **_):
         self.data = load_data(file)
+        self.scene = scene
         self.blendmode = blendmode
-        self.spritesheet = SpriteSheet(self.data, 'slow1')
+        self.spritesheet = SpriteSheet(file, 'slow1', scene.random)
         self.coordinates = Coordinates((startposition))
         self.sequence = []
 
@@ -34,12 +36,12 @@ class Pianist:
 
     def next_animation(self):
         if not self.sequence:
-            slow = random.choice((False, True))
+            slow = self.scene.random.choice((False, True))
             if slow:
-                return random.choice(self.slows)
+                return self.scene.random.choice(self.slows)
             self.sequence = [
-                random.choice(self.fasts),
-                random.choice(self.fasts)]
+                self.scene.random.choice(self.fasts),
+                self.scene.random.choice(self.fasts)]
         return self.sequence.pop()
 
     def __next__(self):
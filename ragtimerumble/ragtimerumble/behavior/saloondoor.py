@@ -12,7 +12,7 @@ class SaloonDoor:
         self.scene = scene
         self.switch = switch
         self.blendmode = blendmode
-        self.spritesheet = SpriteSheet(self.data, 'closed')
+        self.spritesheet = SpriteSheet(file, 'closed', scene.random)
         self.coordinates = Coordinates((position))
         self.zone = zone
 
@@ -14,7 +14,7 @@ class Sniper:
         self.data = load_data(file)
         self.y = y
         self.blendmode = blendmode
-        self.spritesheet = SpriteSheet(self.data, 'idle')
+        self.spritesheet = SpriteSheet(file, 'idle', scene.random)
         self.coordinates = Coordinates((startposition))
         self.reticle = SniperReticle(zone, scene)
         self.interaction_zone = interaction_zone
@@ -1,5 +1,4 @@
 
-import random
 from ragtimerumble.config import (
     DIRECTIONS, SPEED, COUNTDOWNS, HOLDABLE_ANIMATIONS)
 from ragtimerumble.config import LOOPING_ANIMATIONS, CHARACTER_STATUSES
@@ -19,7 +18,7 @@ class Character:
         self.display_name = display_name
         self.speed = 0
         self.scene = scene
-        self.vomit_count_down = random.randrange(
+        self.vomit_count_down = scene.random.randrange(
             COUNTDOWNS.VOMIT_MIN, COUNTDOWNS.VOMIT_MAX)
         self.status = CHARACTER_STATUSES.FREE
         self.duel_target = None
@@ -89,7 +88,7 @@ class Character:
         self.spritesheet.animation = 'vomit'
 
         self.spritesheet.index = 0
-        self.vomit_count_down = random.randrange(
+        self.vomit_count_down = self.scene.random.randrange(
             COUNTDOWNS.VOMIT_MIN, COUNTDOWNS.VOMIT_MAX)
         self.status = CHARACTER_STATUSES.STUCK
 
@@ -333,7 +332,8 @@ class Character:
 
     def go_to(self, position, zone=None):
         self.status = CHARACTER_STATUSES.AUTOPILOT
-        path = shortest_path(self.coordinates.position, position.copy())
+        path = shortest_path(
+            self.coordinates.position, position.copy(), self.scene.random)
         self.pilot = HardPathPilot(self, path)
         self.buffer_interaction_zone = zone
 
@@ -0,0 +1,189 @@
+import math
+import numpy as np
+from ragtimerumble.config import (
+    COLLISION_GRID_CELL_SIZE, COLLISION_MASK_CELL_SIZE, COLLISION_MASK_MARGIN,
+    RESOLUTION)
+from ragtimerumble.coordinates import (
+    box_hit_box, box_hit_polygon, path_cross_polygon, path_cross_rect)
+from ragtimerumble.geometry import Polyline
+
+
+RECT = 'rect'
+POLYGON = 'polygon'
+
+
+def bounding_box(points):
+    xs = [point[0] for point in points]
+    ys = [point[1] for point in points]
+    return min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys)
+
+
+def points_in_polygon(x, y, polygon):
+    """
+    Vectorized even-odd crossing test of the x, y coordinates arrays.
+    """
+    inside = np.zeros(x.shape, dtype=bool)
+    x0, y0 = polygon[-1]
+    for x1, y1 in polygon:
+        above = y1 >= y
+        crossing = (y1 - y) * (x0 - x1) >= (x1 - x) * (y0 - y1)
+        inside ^= (above != (y0 >= y)) & (crossing == above)
+        x0, y0 = x1, y1
+    return inside
+
+
+class CollisionGrid:
+    """
+    Uniform grid bucketing the static colliders of a scene (prop boxes, no go
+    zones and walls). A collision query only tests the colliders registered
+    in the cells covered by the queried box instead of the whole scene.
+    """
+
+    def __init__(self, cell_size=COLLISION_GRID_CELL_SIZE):
+        self.cell_size = cell_size
+        self.colliders = []
+        self.cells = {}
+
+    def clear(self):
+        self.colliders = []
+        self.cells = {}
+
+    def add_rect(self, rect):
+        self.insert(rect, (RECT, rect))
+
+    def add_polygon(self, polygon):
+        self.insert(bounding_box(polygon), (POLYGON, Polyline(polygon)))
+
+    def insert(self, box, collider):
+        index = len(self.colliders)
+        self.colliders.append(collider)
+        for key in self.cells_keys(box):
+            self.cells.setdefault(key, []).append(index)
+
+    def cells_keys(self, box):
+        size = self.cell_size
+        left = int(box[0] // size)
+        right = int((box[0] + box[2]) // size)
+        top = int(box[1] // size)
+        bottom = int((box[1] + box[3]) // size)
+        return [
+            (column, row)
+            for column in range(left, right + 1)
+            for row in range(top, bottom + 1)]
+
+    def candidates(self, box):
+        indexes = set()
+        for key in self.cells_keys(box):
+            indexes.update(self.cells.get(key, ()))
+        return [self.colliders[i] for i in sorted(indexes)]
+
+    def collide(self, box):
+        for type_, shape in self.candidates(box):
+            if type_ == RECT:
+                if box_hit_box(box, shape):
+                    return True
+            elif box_hit_polygon(box, shape):
+                return True
+        return False
+
+    def cross(self, path):
+        for type_, shape in self.candidates(bounding_box(path)):
+            if type_ == RECT:
+                if path_cross_rect(path, shape):
+                    return True
+            elif path_cross_polygon(path, shape):
+                return True
+        return False
+
+
+class CollisionMask:
+    """
+    Walkability raster of the play field (plus a margin). A cell is blocked
+    when it touches a static collider. Collision tests read a summed-area
+    table of the blocked cells, so a box is tested with four lookups whatever
+    its size. The test is conservative: a box can be reported colliding up
+    to one cell earlier than with the exact geometry.
+    """
+
+    def __init__(
+            self, size=RESOLUTION, cell_size=COLLISION_MASK_CELL_SIZE,
+            margin=COLLISION_MASK_MARGIN):
+        self.cell_size = cell_size
+        self.origin = -margin
+        columns = math.ceil((size[0] + 2 * margin) / cell_size)
+        rows = math.ceil((size[1] + 2 * margin) / cell_size)
+        self.cells = np.zeros((rows, columns), dtype=bool)
+        self.summed_area = None
+
+    def copy(self):
+        mask = CollisionMask.__new__(CollisionMask)
+        mask.cell_size = self.cell_size
+        mask.origin = self.origin
+        mask.cells = self.cells.copy()
+        mask.summed_area = None
+        return mask
+
+    def cells_range(self, box):
+        origin, size = self.origin, self.cell_size
+        return (
+            math.floor((box[0] - origin) / size),
+            math.floor((box[1] - origin) / size),
+            math.floor((box[0] + box[2] - origin) / size),
+            math.floor((box[1] + box[3] - origin) / size))
+
+    def add_rect(self, rect):
+        left, top, right, bottom = self.cells_range(rect)
+        self.cells[
+            max(top, 0):max(bottom + 1, 0),
+            max(left, 0):max(right + 1, 0)] = True
+        self.summed_area = None
+
+    def add_polygon(self, polygon):
+        left, top, right, bottom = self.cells_range(bounding_box(polygon))
+        height, width = self.cells.shape
+        left, top = max(left, 0), max(top, 0)
+        right, bottom = min(right, width - 1), min(bottom, height - 1)
+        if left > right or top > bottom:
+            return
+        size = self.cell_size
+        x, y = np.meshgrid(
+            self.origin + np.arange(left, right + 1) * size,
+            self.origin + np.arange(top, bottom + 1) * size)
+        # Cells fully inside the polygon.
+        blocked = points_in_polygon(x + size / 2, y + size / 2, polygon)
+        # Cells crossed by an edge: the edge bounding box overlaps the cell
+        # and the cell corners are not all on the same side of the edge.
+        corners = (x, y), (x + size, y), (x, y + size), (x + size, y + size)
+        for (x1, y1), (x2, y2) in zip(polygon, polygon[1:] + polygon[:1]):
+            sides = [
+                (x2 - x1) * (cy - y1) - (y2 - y1) * (cx - x1)
+                for cx, cy in corners]
+            blocked |= (
+                (np.minimum.reduce(sides) <= 0) &
+                (np.maximum.reduce(sides) >= 0) &
+                (x <= max(x1, x2)) & (x + size >= min(x1, x2)) &
+                (y <= max(y1, y2)) & (y + size >= min(y1, y2)))
+        self.cells[top:bottom + 1, left:right + 1] |= blocked
+        self.summed_area = None
+
+    def bake(self):
+        rows, columns = self.cells.shape
+        self.summed_area = np.zeros((rows + 1, columns + 1), dtype=np.int32)
+        self.summed_area[1:, 1:] = self.cells.cumsum(0).cumsum(1)
+
+    def collide(self, box):
+        """
+        Return None if the box goes out of the mask, the caller has to fall
+        back on exact geometry.
+        """
+        if self.summed_area is None:
+            self.bake()
+        left, top, right, bottom = self.cells_range(box)
+        rows, columns = self.cells.shape
+        if left < 0 or top < 0 or right >= columns or bottom >= rows:
+            return None
+        area = self.summed_area
+        blocked = (
+            area.item(bottom + 1, right + 1) - area.item(top, right + 1) -
+            area.item(bottom + 1, left) + area.item(top, left))
+        return blocked > 0
@@ -4,6 +4,9 @@ GAMEROOT = os.path.dirname(os.path.dirname(__file__))
 
 AVAILABLE_LANGUAGES = ['english', 'french']
 CHICKEN_RUNDISTANCE = 50
+COLLISION_GRID_CELL_SIZE = 32
+COLLISION_MASK_CELL_SIZE = 1
+COLLISION_MASK_MARGIN = 32
 DOG_GROWL_DISTANCE = 70
 DOG_BARK_DISTANCE = 40
 GAMETYPES = ['advanced', 'basic']
@@ -12,12 +15,23 @@ LOOPING_ANIMATIONS = [
     'idle', 'walk', 'piano', 'poker', 'startup',
     'suspicious', 'balcony', 'victory', 'defeat']
 HOLDABLE_ANIMATIONS = ['call', 'death', 'coma']
+SIMULATION_FRAMERATE = 60
 SMOOTH_PATH_SELECTION_RADIUS = 50
+SURFACE_POOL_MAX_IDLE_FRAMES = 120
+SYSTEM_FONT = 'Consolas'
+TELEMETRY_CHUNK_SIZE = 16384
+TELEMETRY_HEADER_SIZE = 1024
+TEXT_CACHE_MAX_BYTES = 4 * 1024 * 1024
 HARD_PATH_SELECTION_RADIUS = 25
+LAST_KILL_FRAMERATE = 30
 SMOOTH_PATH_USAGE_PROBABILITY = 7
 HARD_PATH_USAGE_PROBABILITY = 10
+MAX_CATCHUP_STEPS = 5
 MAX_MESSAGES = 3
+MUSIC_FADE_MS = 1000
 PALLETTES_COUNT = 25
+PROFILER_TRACE_MAX_EVENTS = 500000
+PROFILER_WINDOW = 120
 WIN_OR_LOOSE_AT_POKER_PROBABILITY = (3, 2)
 RESOLUTION = 640, 360
 
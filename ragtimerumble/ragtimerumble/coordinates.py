@@ -1,6 +1,6 @@
 import math
-from matplotlib.path import Path
 from ragtimerumble.config import DIRECTION_TO_VECTOR
+from ragtimerumble.geometry import compile_polyline, rect_to_polyline
 
 
 class Coordinates:
@@ -56,28 +56,18 @@ def point_in_rectangle(p, left, top, width, height):
 
 
 def box_hit_polygon(rect, polygon):
-    tl = [rect[0], rect[1]]
-    tr = [rect[0] + rect[2], rect[1]]
-    bl = [rect[0], rect[1] + rect[3]]
-    br = [rect[0] + rect[2], rect[1] + rect[3]]
-    rect = (tl, tr, bl, br)
-    rect_path = Path(rect)
-    polygon_path = Path(polygon)
-    return rect_path.intersects_path(polygon_path, filled=True)
+    """
+    Polygon can be a list of points or a pre-compiled geometry.Polyline.
+    """
+    return rect_to_polyline(rect).intersects(compile_polyline(polygon))
 
 
 def path_cross_polygon(path, polygon):
-    return Path(path).intersects_path(Path(polygon))
+    return compile_polyline(path).intersects(compile_polyline(polygon))
 
 
 def path_cross_rect(path, rect):
-    tl = [rect[0], rect[1]]
-    tr = [rect[0] + rect[2], rect[1]]
-    bl = [rect[0], rect[1] + rect[3]]
-    br = [rect[0] + rect[2], rect[1] + rect[3]]
-    path = Path(path)
-    path2 = Path([tl, tr, bl, br])
-    return path.intersects_path(path2)
+    return compile_polyline(path).intersects(rect_to_polyline(rect))
 
 
 def norm(vector):
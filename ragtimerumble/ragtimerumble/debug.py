@@ -1,24 +1,29 @@
 import os
-import json
 from ragtimerumble.config import CHARACTER_STATUSES
+from ragtimerumble.telemetry import TelemetryWriter
 
 active = False
 render_path = False
 log_coordinates = False
+profiler_overlay = False
 
-coordinates_log = []
+COORDINATES_LOG_PATH = (
+    f'{os.path.dirname(__file__)}/../../refs/coord.telemetry')
+coordinates_log = None
 
 
-def log_npc_coordinates(scene):
-    for npc in scene.npcs:
-        if npc.character.status != CHARACTER_STATUSES.OUT:
-            if npc.character.speed:
-                coordinates_log.append(npc.character.coordinates.position)
+def log_npc_coordinates(scene, tick):
+    global coordinates_log
+    if coordinates_log is None:
+        coordinates_log = TelemetryWriter(COORDINATES_LOG_PATH)
+    npcs = {id(npc.character) for npc in scene.npcs}
+    coordinates_log.record(tick, scene.characters, lambda character: (
+        id(character) in npcs and
+        character.status != CHARACTER_STATUSES.OUT and
+        character.speed))
 
 
 def close():
-    if active is False:
+    if coordinates_log is None:
         return
-    statpath = f'{os.path.dirname(__file__)}/../../refs/coord.json'
-    with open(statpath, 'w') as f:
-        json.dump(coordinates_log, f)
+    coordinates_log.close()
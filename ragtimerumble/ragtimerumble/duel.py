@@ -1,41 +1,60 @@
+from bisect import bisect_left, bisect_right
 from ragtimerumble.config import DIRECTIONS, CHARACTER_STATUSES, DUEL
-from ragtimerumble.coordinates import path_cross_rect
+from ragtimerumble.geometry import Polyline, bboxes_overlap
 
 
 def find_possible_duels(scene):
-    characters = scene.characters
+    """
+    Sweep and prune: duelable characters are sorted by y and each origin is
+    only compared to the characters standing in its DUEL.TOLERENCE band.
+    For each origin, the target is the closest valid character (the last one
+    in scene order on equality).
+    """
+    characters = [
+        (index, character)
+        for index, character in enumerate(scene.characters)
+        if character.status in CHARACTER_STATUSES.DUELABLES]
+    characters.sort(key=lambda item: item[1].coordinates.y)
+    ys = [character.coordinates.y for _, character in characters]
+    # Slightly widen the band, the exact tolerance test is done per pair.
+    band = DUEL.TOLERENCE + 1
+
     possible_duels = []
-    for char1 in characters:
+    for char1 in scene.characters:
         if char1.status not in CHARACTER_STATUSES.DUELABLES:
             continue
+        y1 = char1.coordinates.y
+        start = bisect_left(ys, y1 - band)
+        end = bisect_right(ys, y1 + band)
+        candidates = sorted(characters[start:end], key=lambda item: item[0])
         duel = None
         duel_distance = None
 
-        for char2 in characters:
-            if char2.status not in CHARACTER_STATUSES.DUELABLES:
-                continue
+        for _, char2 in candidates:
             if char1 == char2:
                 continue
 
-            height = char1.coordinates.y - char2.coordinates.y
+            height = y1 - char2.coordinates.y
             if abs(height) > DUEL.TOLERENCE:
                 continue
 
             x1 = char1.coordinates.x
             x2 = char2.coordinates.x
-            path = char1.coordinates.position, char2.coordinates.position
             conditions = (
                 char1.direction in DIRECTIONS.RIGHTS and (x1 - x2) > 0 or
                 char1.direction in DIRECTIONS.LEFTS and (x2 - x1) > 0 or
-                not (DUEL.RANGE[0] <= abs(x1 - x2) <= DUEL.RANGE[1]) or
-                any(path_cross_rect(path, fence) for fence in scene.fences))
-
+                not (DUEL.RANGE[0] <= abs(x1 - x2) <= DUEL.RANGE[1]))
             if conditions:
                 continue
 
             dist = char1.coordinates.distance_to(char2.coordinates)
             if duel_distance and dist > duel_distance:
                 continue
+
+            path = char1.coordinates.position, char2.coordinates.position
+            if fence_blocks(scene, path):
+                continue
+
             duel = (char1, char2)
             duel_distance = dist
 
@@ -43,3 +62,15 @@ def find_possible_duels(scene):
             possible_duels.append(duel)
 
     return possible_duels
+
+
+def fence_blocks(scene, path):
+    (x1, y1), (x2, y2) = path
+    bbox = min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
+    fences = [
+        fence for fence in scene.fences_polylines
+        if bboxes_overlap(bbox, fence.bbox)]
+    if not fences:
+        return False
+    path = Polyline(path)
+    return any(path.intersects(fence) for fence in fences)
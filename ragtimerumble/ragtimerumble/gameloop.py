@@ -1,19 +1,27 @@
+import math
+import time
 import random
 import pygame
 from copy import deepcopy
 from ragtimerumble import preferences
+from ragtimerumble import profiler
 from ragtimerumble.io import (
     list_joysticks, stop_ambiance, play_dispatcher_music, quit_event,
     stop_sound, play_sound, get_current_commands, stop_scene_music,
-    stop_dispatcher_music, play_scene_music)
+    stop_dispatcher_music, play_scene_music, update_music)
+from ragtimerumble.joystick import sample_joysticks, set_snapshots
 from ragtimerumble.config import (
-    LOOP_STATUSES, COUNTDOWNS, DIRECTIONS)
+    LOOP_STATUSES, COUNTDOWNS, DIRECTIONS, LAST_KILL_FRAMERATE,
+    MAX_CATCHUP_STEPS, SIMULATION_FRAMERATE)
 from ragtimerumble.menu import (
     Menu, ScoreSheetScreen, FinalScoreScreen, PauseMenu, NavigationButton)
 from ragtimerumble.scene import (
-    load_scene, populate_scene, depopulate_scene, scene_iterator)
+    load_scene, populate_scene, depopulate_scene, prefetch_scene,
+    scene_iterator)
 from ragtimerumble.player import Player
 from ragtimerumble.behavior import Npc
+from ragtimerumble.replay import (
+    ReplayJoystick, create_round_record, iter_inputs, record_inputs)
 from ragtimerumble.scores import VIRGIN_SCORES
 
 
@@ -21,17 +29,30 @@ class GameLoop:
     def __init__(
             self, unlocked_fps=False,
             default_scene=None,
-            loop_on_default_scene=False):
+            loop_on_default_scene=False,
+            headless=False,
+            seed=None,
+            record_replay=False,
+            replay=None):
         self.status = LOOP_STATUSES.MENU
         self.unlocked_fps = unlocked_fps
+        self.headless = headless
         self.scene_path = None
         self.scenes_iterator = scene_iterator(
             default_scene, loop_on_default_scene)
         self.scenes_cache = {}
+        self.next_scene_path = None
         self.scene = None
         self.dispatcher = None
         self.done = False
-        self.clock = pygame.time.Clock()
+        self.last_time = time.perf_counter()
+        self.lag = 0
+        # Draws the seed of every round.
+        self.random = random.Random(seed)
+        self.recorded_rounds = [] if record_replay else None
+        self.round_record = None
+        self.replay_rounds = iter(replay or [])
+        self.replay_inputs = iter([]) if replay else None
         self.scores = deepcopy(VIRGIN_SCORES)
         self.joysticks = list_joysticks()
         self.scores_screen = None
@@ -43,22 +64,116 @@ class GameLoop:
         self.scene = None
         self.dispatcher = None
         self.done = False
-        self.clock = pygame.time.Clock()
+        self.round_record = None
         self.scores = deepcopy(VIRGIN_SCORES)
         self.joysticks = list_joysticks()
         self.scores_screen = None
         self.menu = Menu(self.joysticks)
         self.menu.button_countdown = COUNTDOWNS.MENU_SELECTION_COOLDOWN * 2
-        self.set_scene(next(self.scenes_iterator))
+        self.set_scene(self.pop_next_scene_path())
 
     def set_scene(self, path):
         self.scene_path = path
-        self.scene = self.scenes_cache.setdefault(path, load_scene(path))
-
-    def start_scene(self, start_music=True):
+        if path not in self.scenes_cache:
+            self.scenes_cache[path] = load_scene(path)
+        self.scene = self.scenes_cache[path]
+
+    def prefetch_next_scene(self):
+        """
+        The next scene images are decoded while the scores are on screen.
+        """
+        if self.next_scene_path is None:
+            self.next_scene_path = next(self.scenes_iterator)
+            prefetch_scene(self.next_scene_path)
+
+    def pop_next_scene_path(self):
+        path = self.next_scene_path or next(self.scenes_iterator)
+        self.next_scene_path = None
+        return path
+
+    @property
+    def step_duration(self):
+        if self.status == LOOP_STATUSES.LAST_KILL:
+            return 1 / LAST_KILL_FRAMERATE
+        return 1 / SIMULATION_FRAMERATE
+
+    def steps(self):
+        """
+        Run the simulation steps due since the last call, in fixed steps of
+        step_duration, and yield after each one. Rendering is expected once
+        per call. A long frame is caught up with at most MAX_CATCHUP_STEPS
+        steps, the rest of the delay is dropped. Without unlocked fps, wait
+        for the next step to be due. In headless, run exactly one step. Only
+        the steps actually simulated are yielded.
+        """
+        if self.headless:
+            if next(self):
+                yield
+            return
+        now = time.perf_counter()
+        remaining = self.step_duration - self.lag - (now - self.last_time)
+        if not self.unlocked_fps and remaining > 0:
+            with profiler.scope('loop.wait'):
+                pygame.time.wait(math.ceil(remaining * 1000))
+            now = time.perf_counter()
+        self.lag += now - self.last_time
+        self.last_time = now
+        steps = 0
+        while self.lag >= self.step_duration and not self.done:
+            if steps == MAX_CATCHUP_STEPS:
+                self.lag = 0
+                return
+            self.lag -= self.step_duration
+            if not next(self):
+                return
+            steps += 1
+            yield
+
+    def start_headless(self):
+        """
+        Skip menu and dispatching, fill the current scene with npcs only and
+        jump straight to the battle. Used to run simulation without any
+        window, sound device or joystick.
+        """
+        self.start_scene(start_music=False)
+        self.start_round(start_music=False)
+
+    def start_replay_round(self, record):
+        """
+        Restart a recorded round: same scene, gametype and seed, the
+        joysticks being replaced by the recorded snapshots.
+        """
+        preferences.set('gametype', record['gametype'])
+        self.set_scene(record['scene'])
+        self.joysticks = [
+            ReplayJoystick(i) for i in range(record['joysticks'])]
+        self.start_scene(start_music=False, seed=record['seed'])
+        if not self.joysticks:
+            # Recorded in headless, without dispatching.
+            self.start_round(start_music=False)
+        self.replay_inputs = iter_inputs(record)
+
+    def next_replay_inputs(self):
+        while True:
+            masks = next(self.replay_inputs, None)
+            if masks is not None:
+                return masks
+            record = next(self.replay_rounds, None)
+            if record is None:
+                return None
+            self.start_replay_round(record)
+
+    def start_scene(self, start_music=True, seed=None):
         gametype = preferences.get('gametype')
+        if seed is None:
+            seed = self.random.randrange(2 ** 32)
         depopulate_scene(self.scene)
-        populate_scene(self.scene_path, self.scene, gametype=gametype)
+        populate_scene(
+            self.scene_path, self.scene, gametype=gametype, seed=seed)
+        if self.recorded_rounds is not None:
+            self.round_record = create_round_record(
+                self.scene_path, gametype, seed, self.joysticks)
+            self.recorded_rounds.append(self.round_record)
         self.status = LOOP_STATUSES.DISPATCHING
         self.dispatcher = PlayerDispatcher(self.scene, self.joysticks)
         stop_ambiance()
@@ -73,7 +188,6 @@ class GameLoop:
         if self.menu.start is True:
             self.joysticks = list_joysticks()
             self.start_scene(start_music=False)
-        self.clock.tick(60)
 
     def evaluate_pause(self):
         if self.pause_menu.done:
@@ -90,7 +204,6 @@ class GameLoop:
         if self.pause_menu.quit_game:
             self.done = True
         next(self.pause_menu)
-        self.clock.tick(60)
         return
 
     def evaluate_battle(self):
@@ -109,21 +222,17 @@ class GameLoop:
             stop_sound(self.scene.ambiance)
             stop_scene_music()
             self.show_score()
-        if not self.unlocked_fps:
-            self.clock.tick(60)
 
     def evaluate_dispatching(self):
         next(self.dispatcher)
-        self.clock.tick(60)
         if self.dispatcher.back_to_menu:
             self.reset_game()
             return
         if self.dispatcher.done:
             stop_dispatcher_music()
-            self.start_round()
+            self.start_round(start_music=not self.headless)
 
     def evaluate_last_kill(self):
-        self.clock.tick(30)
         next(self.scene)
         if self.scene.done:
             self.show_score()
@@ -133,9 +242,8 @@ class GameLoop:
         if self.scores_screen.next_round is True:
             if self.scores_screen.is_final:
                 return self.show_finale_sheet()
-            self.set_scene(next(self.scenes_iterator))
+            self.set_scene(self.pop_next_scene_path())
             self.start_scene()
-            self.clock.tick(60)
         if self.scores_screen.back_to_menu is True:
             self.reset_game()
 
@@ -143,32 +251,51 @@ class GameLoop:
         next(self.scores_screen)
         if self.scores_screen.is_done:
             self.reset_game()
-        self.clock.tick(60)
 
     def __next__(self):
+        """
+        Simulate one step. Return False if the loop ended before, on quit or
+        when the replayed inputs are exhausted.
+        """
         self.done = self.done or quit_event()
         if self.done:
-            return
-        match self.status:
-            case LOOP_STATUSES.MENU:
-                self.evaluate_menu()
-            case LOOP_STATUSES.PAUSE:
-                self.evaluate_pause()
-            case LOOP_STATUSES.BATTLE:
-                self.evaluate_battle()
-            case LOOP_STATUSES.DISPATCHING:
-                self.evaluate_dispatching()
-            case LOOP_STATUSES.LAST_KILL:
-                self.evaluate_last_kill()
-            case LOOP_STATUSES.SCORE:
-                self.evaluate_score()
-            case LOOP_STATUSES.END_GAME:
-                self.evaluate_final_sheet()
+            return False
+        with profiler.scope('loop.music'):
+            update_music()
+        with profiler.scope('loop.inputs'):
+            if self.replay_inputs is not None:
+                masks = self.next_replay_inputs()
+                if masks is None:
+                    self.done = True
+                    return False
+                set_snapshots(self.joysticks, masks)
+            else:
+                masks = sample_joysticks(self.joysticks)
+            if self.round_record is not None:
+                record_inputs(self.round_record, masks)
+        with profiler.scope(f'loop.{self.status}'):
+            match self.status:
+                case LOOP_STATUSES.MENU:
+                    self.evaluate_menu()
+                case LOOP_STATUSES.PAUSE:
+                    self.evaluate_pause()
+                case LOOP_STATUSES.BATTLE:
+                    self.evaluate_battle()
+                case LOOP_STATUSES.DISPATCHING:
+                    self.evaluate_dispatching()
+                case LOOP_STATUSES.LAST_KILL:
+                    self.evaluate_last_kill()
+                case LOOP_STATUSES.SCORE:
+                    self.evaluate_score()
+                case LOOP_STATUSES.END_GAME:
+                    self.evaluate_final_sheet()
+        return True
 
     def show_finale_sheet(self):
         self.status = LOOP_STATUSES.END_GAME
         self.scores_screen = FinalScoreScreen(
             self.scene.players, self.scores, self.joysticks)
+        self.prefetch_next_scene()
 
     def show_score(self):
         winner = next((p.index for p in self.scene.players if not p.dead), -1)
@@ -202,16 +329,19 @@ class GameLoop:
             coord = self.scores_screen.characters_coordinates[player.index]
             player.character.coordinates = coord
         depopulate_scene(self.scene, clear_players=False)
+        self.round_record = None
         self.status = LOOP_STATUSES.SCORE
+        self.prefetch_next_scene()
 
-    def start_round(self):
+    def start_round(self, start_music=True):
         while len(self.scene.characters) < self.scene.character_number:
             self.scene.build_character()
         self.scene.create_npcs()
         self.scores['round'] += 1
         self.status = LOOP_STATUSES.BATTLE
-        play_sound(self.scene.ambiance, -1)
-        play_scene_music(self.scene.musics)
+        if start_music:
+            play_sound(self.scene.ambiance, -1)
+            play_scene_music(self.scene.musics)
 
 
 class PlayerDispatcher:
@@ -243,9 +373,10 @@ class PlayerDispatcher:
                     if j == k:
                         continue
                     npc = Npc(self.characters[group][k], self.scene)
-                    npc.interaction_loop_cooldown = random.choice(range(
-                        COUNTDOWNS.INTERACTION_LOOP_COOLDOWN_MIN,
-                        COUNTDOWNS.INTERACTION_LOOP_COOLDOWN_MAX))
+                    npc.interaction_loop_cooldown = self.scene.random.choice(
+                        range(
+                            COUNTDOWNS.INTERACTION_LOOP_COOLDOWN_MIN,
+                            COUNTDOWNS.INTERACTION_LOOP_COOLDOWN_MAX))
                     self.scene.npcs.append(npc)
                     play_sound('resources/sounds/coltclick.wav')
                     joystick.rumble(1, 1, 1)
@@ -0,0 +1,133 @@
+"""
+Segment, rectangle and polygon intersection routines.
+
+This mirrors the behaviour of matplotlib's `Path.intersects_path` (with the
+default filled=True) the game relied on, without building new Path objects
+at every test: shapes are compiled once into a `Polyline` and reused.
+"""
+
+
+def isclose(a, b):
+    # Same tolerances as matplotlib's path intersection code.
+    return abs(a - b) <= max(1e-10 * max(abs(a), abs(b)), 1e-13)
+
+
+def segments_intersect(x1, y1, x2, y2, x3, y3, x4, y4):
+    den = ((y4 - y3) * (x2 - x1)) - ((x4 - x3) * (y2 - y1))
+    if isclose(den, 0.0):
+        area = (x2 * y3 - x3 * y2) - x1 * (y3 - y2) + y1 * (x3 - x2)
+        if not isclose(area, 0.0):
+            # Parallel segments.
+            return False
+        # Collinear segments.
+        if x1 == x2 == x3:
+            a, b, c, d = y1, y2, y3, y4
+        else:
+            a, b, c, d = x1, x2, x3, x4
+        return (
+            min(a, b) <= min(c, d) <= max(a, b) or
+            min(c, d) <= min(a, b) <= max(c, d))
+
+    u1 = (((x4 - x3) * (y1 - y3)) - ((y4 - y3) * (x1 - x3))) / den
+    u2 = (((x2 - x1) * (y1 - y3)) - ((y2 - y1) * (x1 - x3))) / den
+    return (
+        (u1 > 0.0 or isclose(u1, 0.0)) and
+        (u1 < 1.0 or isclose(u1, 1.0)) and
+        (u2 > 0.0 or isclose(u2, 0.0)) and
+        (u2 < 1.0 or isclose(u2, 1.0)))
+
+
+def point_in_polygon(x, y, points):
+    """
+    Even-odd crossing test. The polygon is implicitly closed.
+    """
+    inside = False
+    x0, y0 = points[-1]
+    yflag0 = y0 >= y
+    for x1, y1 in points:
+        yflag1 = y1 >= y
+        if yflag0 != yflag1:
+            crossing = (y1 - y) * (x0 - x1) >= (x1 - x) * (y0 - y1)
+            if crossing == yflag1:
+                inside = not inside
+        yflag0 = yflag1
+        x0, y0 = x1, y1
+    return inside
+
+
+class Polyline:
+    """
+    Pre-compiled list of points: segments and bounding box are computed once
+    to make repeated intersection tests cheap.
+    """
+
+    def __init__(self, points):
+        self.points = [(float(x), float(y)) for x, y in points]
+        self.segments = []
+        if self.points:
+            xs = [x for x, _ in self.points]
+            ys = [y for _, y in self.points]
+            self.bbox = min(xs), min(ys), max(xs), max(ys)
+            x1, y1 = self.points[0]
+        else:
+            self.bbox = None
+        for x2, y2 in self.points[1:]:
+            # Skip (almost) zero length segments.
+            if isclose((x1 - x2) ** 2 + (y1 - y2) ** 2, 0.0):
+                continue
+            self.segments.append((x1, y1, x2, y2))
+            x1, y1 = x2, y2
+
+    def contains(self, polyline):
+        """
+        Return True if every point of the given polyline is inside this one,
+        considered as a filled polygon.
+        """
+        if len(self.points) < 3:
+            return False
+        return all(
+            point_in_polygon(x, y, self.points) for x, y in polyline.points)
+
+    def crosses(self, polyline):
+        if len(self.points) < 2 or len(polyline.points) < 2:
+            return False
+        return any(
+            segments_intersect(*segment1, *segment2)
+            for segment1 in self.segments
+            for segment2 in polyline.segments)
+
+    def intersects(self, polyline):
+        if not bboxes_overlap(self.bbox, polyline.bbox):
+            return False
+        return (
+            self.crosses(polyline) or
+            self.contains(polyline) or
+            polyline.contains(self))
+
+
+def bboxes_overlap(bbox1, bbox2, margin=1e-6):
+    if bbox1 is None or bbox2 is None:
+        return False
+    return (
+        bbox1[0] <= bbox2[2] + margin and
+        bbox2[0] <= bbox1[2] + margin and
+        bbox1[1] <= bbox2[3] + margin and
+        bbox2[1] <= bbox1[3] + margin)
+
+
+def compile_polyline(points):
+    if isinstance(points, Polyline):
+        return points
+    return Polyline(points)
+
+
+def rect_to_polyline(rect):
+    # The vertex order (crossing top-right to bottom-left) is the one the
+    # game has always used for its rectangle paths. Keep it to preserve the
+    # historical collision results.
+    left, top, width, height = rect
+    return Polyline((
+        (left, top),
+        (left + width, top),
+        (left, top + height),
+        (left + width, top + height)))
@@ -4,23 +4,39 @@ import json
 import pygame
 import random
 import itertools
+import threading
+from collections import OrderedDict
 from ragtimerumble import preferences
-from ragtimerumble.config import GAMEROOT, PALLETTES_COUNT
+from ragtimerumble.config import (
+    GAMEROOT, MUSIC_FADE_MS, PALLETTES_COUNT, SYSTEM_FONT,
+    TEXT_CACHE_MAX_BYTES)
 from ragtimerumble.joystick import get_current_commands
+from ragtimerumble.palette import index_colors, swap_color_table
 
 
 _ambiance_channel = None
 _animation_store = {}
+_data_store = {}
+_font_store = {}
 _image_store = {}
+_indexed_sheets = {}
 _name_generators = {}
 _death_sentences_generators = {}
+_decoded_files = set()
 _kill_sentences_generators = {}
 _palettes = {}
+_prefetched_images = {}
+_prefetch_lock = threading.Lock()
+_skin_variants = set()
 _sounds = {}
 _dispatcher_music = None
+_music = None
+_music_target = None
 _scene_music = None
 _menu_texts = {}
 _scoresheet_texts = {}
+_text_cache = OrderedDict()
+_text_cache_size = 0
 
 
 def play_coin_sound():
@@ -31,19 +47,16 @@ def play_coin_sound():
 
 
 def play_scene_music(sounds):
-    sound = random.choice(sounds)
     global _scene_music
-    if _scene_music:
-        stop_scene_music()
-    _scene_music = load_sound(sound)
-    _scene_music.play(-1)
+    _scene_music = random.choice(sounds)
+    play_music(_scene_music)
 
 
 def stop_scene_music():
     global _scene_music
     if not _scene_music:
         return
-    _scene_music.stop()
+    stop_music(_scene_music)
     _scene_music = None
 
 
@@ -66,12 +79,9 @@ def play_dispatcher_music():
         'resources/sounds/dispatcher_1_sound.ogg',
         'resources/sounds/dispatcher_2_ErikVargas_TonkyMyHonky.ogg',
         'resources/sounds/dispatcher_3_JakeSchneider_HonkyTonkSaloon.ogg')
-    sound = random.choice(sounds)
     global _dispatcher_music
-    if _dispatcher_music:
-        stop_dispatcher_music()
-    _dispatcher_music = load_sound(sound)
-    _dispatcher_music.play(-1)
+    _dispatcher_music = random.choice(sounds)
+    play_music(_dispatcher_music)
 
 
 def get_touch_button_image(button):
@@ -86,7 +96,7 @@ def stop_dispatcher_music():
     global _dispatcher_music
     if not _dispatcher_music:
         return
-    _dispatcher_music.stop()
+    stop_music(_dispatcher_music)
     _dispatcher_music = None
 
 
@@ -95,22 +105,25 @@ def get_coin_stack(n):
     return get_image(load_image(path))
 
 
-def choice_display_name(data):
-    if not _name_generators.get(data["name"]):
-        names = data["names"]
-        random.shuffle(names)
-        _name_generators[data["name"]] = itertools.cycle(names)
-    return next(_name_generators[data["name"]])
+def choice_display_name(data, rng=random, generators=_name_generators):
+    if not generators.get(data["name"]):
+        names = list(data["names"])
+        rng.shuffle(names)
+        generators[data["name"]] = itertools.cycle(names)
+    return next(generators[data["name"]])
 
 
-def build_random_palette(palettes):
-    indexes = list(range(len(palettes)))
-    palettes = [palettes[i] for i in indexes[:len(palettes)]]
+def random_palette_indexes(palettes):
+    return [
+        random.randrange(0, len(palette['palettes']))
+        for palette in palettes]
+
+
+def build_palette(palettes, indexes):
     palette_source = [c for v in palettes for c in v['origins']]
     palette_dest = []
     ids = []
-    for palette in palettes:
-        index = random.randrange(0, len(palette['palettes']))
+    for palette, index in zip(palettes, indexes):
         ids.append([palette['name'], index])
         palette_dest.extend(palette['palettes'][index])
     id_ = '-'.join(f'{id_[0]}.{id_[1]}' for id_ in ids)
@@ -231,61 +244,150 @@ def list_joysticks():
     return joysticks[:4]
 
 
-def swap_colors(surface, palette1, palette2):
-    arr = pygame.surfarray.pixels3d(surface)
-    red, green, blue = arr.T
-    for color1, color2 in zip(palette1, palette2):
-        if color1 == color2:
-            continue
-        areas = (red == color1[0]) & (blue == color1[2]) & (green == color1[1])
-        arr[..., ][areas.T] = color2
-    new_surface = pygame.surfarray.make_surface(arr).convert_alpha()
-    alpha_array = pygame.surfarray.pixels_alpha(surface)
-    pygame.surfarray.pixels_alpha(new_surface)[:] = alpha_array[:]
-    return new_surface
-
-
 def load_skins():
     directory = f'{GAMEROOT}/resources/animdata'
     skins = [f'{directory}/{file}' for file in os.listdir(directory)]
     for skin in skins:
         with open(skin, 'r') as f:
             data = json.load(f)
-        load_skin(data)
+        if not data.get('palettes'):
+            load_skin(data)
+            continue
+        get_character_palette_ids(data)
+        load_indexed_sheet(f'{GAMEROOT}/{data["filepath"]}')
 
 
 def get_font(filename):
     return f'{GAMEROOT}/resources/fonts/{filename}'
 
 
+def load_font(filename=None, size=15):
+    """
+    Fonts are built once per (file, size). Without filename, the system font
+    is used.
+    """
+    key = filename, size
+    if key not in _font_store:
+        if filename is None:
+            font = pygame.font.SysFont(SYSTEM_FONT, size)
+        else:
+            font = pygame.font.Font(get_font(filename), size)
+        _font_store[key] = font
+    return _font_store[key]
+
+
+def render_text(font, text, color, antialias=False):
+    """
+    Rasterized texts are kept in a least recently used cache capped to
+    TEXT_CACHE_MAX_BYTES. The returned surface is shared: copy it before
+    modifying it.
+    """
+    global _text_cache_size
+    if not isinstance(color, str):
+        color = tuple(color)
+    key = font, text, color, antialias
+    surface = _text_cache.get(key)
+    if surface is not None:
+        _text_cache.move_to_end(key)
+        return surface
+    surface = font.render(text, antialias, color)
+    _text_cache[key] = surface
+    _text_cache_size += surface_bytes(surface)
+    while _text_cache_size > TEXT_CACHE_MAX_BYTES and len(_text_cache) > 1:
+        _, removed = _text_cache.popitem(last=False)
+        _text_cache_size -= surface_bytes(removed)
+    return surface
+
+
+def surface_bytes(surface):
+    return surface.get_pitch() * surface.get_height()
+
+
 def get_character_palette_ids(data):
     result = _palettes.setdefault(data["name"], [])
     if result:
         return result
     for _ in range(PALLETTES_COUNT):
-        result.append(build_random_palette(data['palettes']))
-    _palettes[data["name"]] = result
+        indexes = random_palette_indexes(data['palettes'])
+        result.append(build_palette(data['palettes'], indexes))
     return result
 
 
-def load_skin(data):
+def load_skin(data, palette=0):
+    """
+    Return the frame ids of a skin palette variant.
+    """
     size = data['framesize']
     path = data["filepath"]
     if not data.get('palettes'):
         # Build original colors skin.
-        return [load_frames(path, size, (0, 255, 0))]
-    # Build color palettes
-    result = []
-    palettes = get_character_palette_ids(data) if data.get('palettes') else []
-    for id_, palette1, palette2 in palettes:
-        variant = load_frames(path, size, (0, 255, 0), palette1, palette2, id_)
-        result.append(variant)
-    return result
+        return load_frames(path, size, (0, 255, 0))
+    return load_skin_variant(data, palette)
 
 
-def load_frames(
-        filepath, frame_size, key_color,
-        palette1=None, palette2=None, palette=0):
+def load_indexed_sheet(filepath):
+    """
+    Skins with palettes are kept as an 8 bits sheet: their variants only
+    differ by the color table.
+    """
+    if filepath in _indexed_sheets:
+        return _indexed_sheets[filepath]
+    sheet = decode_image(filepath).convert_alpha()
+    pixels = pygame.surfarray.pixels3d(sheet)
+    alpha = pygame.surfarray.pixels_alpha(sheet)
+    try:
+        indexes, colors = index_colors(pixels, alpha)
+    except ValueError as e:
+        raise ValueError(f'Cannot index the skin sheet {filepath}: {e}')
+    del pixels, alpha
+    indexed = pygame.Surface(sheet.get_size(), 0, 8)
+    pygame.surfarray.blit_array(indexed, indexes)
+    indexed.set_colorkey(0)
+    _indexed_sheets[filepath] = indexed, colors
+    return indexed, colors
+
+
+def get_skin_variant_id(data, palette):
+    id_ = get_character_palette_ids(data)[palette][0]
+    # Same id as the one load_frames gives.
+    return f'{GAMEROOT}/{GAMEROOT}/{data["filepath"]}.{id_}'
+
+
+def load_skin_variant(data, palette):
+    """
+    The 32 bits frames of a palette variant are only built at first use, from
+    the indexed sheet.
+    """
+    filename_id = get_skin_variant_id(data, palette)
+    if _animation_store.get(filename_id):
+        return _animation_store[filename_id]
+    _, palette1, palette2 = get_character_palette_ids(data)[palette]
+    filepath = f'{GAMEROOT}/{data["filepath"]}'
+    indexed, colors = load_indexed_sheet(filepath)
+    indexed.set_palette(swap_color_table(colors, palette1, palette2))
+    _skin_variants.add(filename_id)
+    return split_sheet(
+        indexed.convert_alpha(), data['framesize'], filename_id, filepath)
+
+
+def release_skin_variants(used=()):
+    """
+    Drop the frames, mirrors and effects of the skin palette variants not
+    listed in used as (data, palette).
+    """
+    kept = {get_skin_variant_id(data, palette) for data, palette in used}
+    released = _skin_variants - kept
+    if not released:
+        return
+    _skin_variants.intersection_update(kept)
+    for filename_id in released:
+        del _animation_store[filename_id]
+    ids = [id_ for id_ in _image_store if id_.partition('[')[0] in released]
+    for id_ in ids:
+        del _image_store[id_]
+
+
+def load_frames(filepath, frame_size, key_color, palette=0):
     """
     Split a huge sheet in memory.
     """
@@ -294,9 +396,11 @@ def load_frames(
     if _animation_store.get(filename_id):
         return _animation_store.get(filename_id, [])
 
-    sheet = pygame.image.load(filepath).convert_alpha()
-    if palette1 and palette2:
-        sheet = swap_colors(sheet, palette1, palette2)
+    sheet = decode_image(filepath).convert_alpha()
+    return split_sheet(sheet, frame_size, filename_id, filepath)
+
+
+def split_sheet(sheet, frame_size, filename_id, filepath):
     width, height = frame_size
     row = sheet.get_height() / height
     col = sheet.get_width() / width
@@ -306,12 +410,14 @@ def load_frames(
             "match with his block size")
         raise ValueError(message)
     ids = []
+    # Frames are views on a single atlas. Blitting the sheet on a transparent
+    # surface gives them the pixels they had as separate copies.
+    atlas = pygame.Surface(sheet.get_size(), pygame.SRCALPHA)
+    atlas.blit(sheet, (0, 0))
 
     for j, i in itertools.product(range(int(row)), range(int(col))):
-        image = pygame.Surface([width, height], pygame.SRCALPHA)
         x, y = i * width, j * height
-        image.blit(sheet, (0, 0), (x, y, width, height))
-        # image.set_colorkey((0, 0, 0, 0))
+        image = atlas.subsurface((x, y, width, height))
         id_ = f'{filename_id}[{i}.{j}]'
         _image_store[id_] = image
         ids.append(id_)
@@ -329,11 +435,47 @@ def get_image(image_id):
     return _image_store.get(image_id)
 
 
+def prefetch_images(filenames):
+    """
+    Decode image files in a background thread, their surfaces are converted
+    on the main thread when they get loaded. Return the thread.
+    """
+    filepaths = [f'{GAMEROOT}/{filename}' for filename in filenames]
+    filepaths = [f for f in filepaths if f not in _decoded_files]
+    with _prefetch_lock:
+        # Forget the images of a former prefetch which were never loaded.
+        _prefetched_images.clear()
+    thread = threading.Thread(
+        target=decode_images, args=(filepaths,), daemon=True)
+    thread.start()
+    return thread
+
+
+def decode_images(filepaths):
+    for filepath in dict.fromkeys(filepaths):
+        try:
+            image = pygame.image.load(filepath)
+        except (pygame.error, OSError) as e:
+            print(f'Cannot prefetch {filepath}: {e}')
+            continue
+        with _prefetch_lock:
+            _prefetched_images[filepath] = image
+
+
+def decode_image(filepath):
+    with _prefetch_lock:
+        image = _prefetched_images.pop(filepath, None)
+    _decoded_files.add(filepath)
+    if image is None:
+        return pygame.image.load(filepath)
+    return image
+
+
 def load_image(filename, key_color=None, flipped=False):
     if _image_store.get(filename) and flipped is False:
         return filename
     filepath = f'{GAMEROOT}/{filename}'
-    image = pygame.image.load(filepath).convert_alpha()
+    image = decode_image(filepath).convert_alpha()
     if key_color is not None:
         image.set_colorkey(key_color)
     _image_store[filename] = image
@@ -341,9 +483,17 @@ def load_image(filename, key_color=None, flipped=False):
 
 
 def load_data(filename):
-    filepath = f'{GAMEROOT}/{filename}'
-    with open(filepath, 'r') as f:
-        return json.load(f)
+    """
+    Data files are parsed once per process. The data returned is shared and
+    must not be modified.
+    """
+    data = _data_store.get(filename)
+    if data is None:
+        filepath = f'{GAMEROOT}/{filename}'
+        with open(filepath, 'r') as f:
+            data = json.load(f)
+        _data_store[filename] = data
+    return data
 
 
 def load_sound(filename):
@@ -359,13 +509,47 @@ def load_sound(filename):
 
 
 def play_music(filename):
-    pygame.mixer.music.load(f'{GAMEROOT}/{filename}')
-    pygame.mixer.music.play()
+    """
+    Musics are streamed from the file instead of being decoded in memory
+    like the sounds. There is a single music stream: the current music fades
+    out and the next one fades in once the stream is free (see update_music).
+    """
+    global _music_target
+    _music_target = filename
+    if _music != filename and pygame.mixer.music.get_busy():
+        pygame.mixer.music.fadeout(MUSIC_FADE_MS)
+    update_music()
+
 
+def stop_music(filename=None):
+    """
+    Fade out the music. If a filename is given, the music is only stopped if
+    it is still the one expected to play.
+    """
+    global _music_target
+    if filename is not None and filename != _music_target:
+        return
+    _music_target = None
+    if pygame.mixer.music.get_busy():
+        pygame.mixer.music.fadeout(MUSIC_FADE_MS)
 
-def stop_music():
-    pygame.mixer.music.stop()
-    pygame.mixer.music.unload()
+
+def update_music():
+    """
+    Start the expected music once the previous one has faded out. To call
+    every frame.
+    """
+    global _music
+    if pygame.mixer.music.get_busy():
+        return
+    if _music_target is None:
+        if _music is not None:
+            pygame.mixer.music.unload()
+            _music = None
+        return
+    _music = _music_target
+    pygame.mixer.music.load(f'{GAMEROOT}/{_music}')
+    pygame.mixer.music.play(-1, fade_ms=MUSIC_FADE_MS)
 
 
 def play_ambiance(filename):
@@ -390,6 +574,23 @@ def stop_sound(filename):
         sound.stop()
 
 
+def sounds_report():
+    """
+    Memory used by the sounds decoded in memory (the musics are streamed).
+    """
+    if not pygame.mixer.get_init():
+        return 'no audio device'
+    frequency, size, channels = pygame.mixer.get_init()
+    frame_size = abs(size) // 8 * channels
+    total = sum(
+        round(sound.get_length() * frequency) * frame_size
+        for sound in _sounds.values())
+    music = f'streaming {_music}' if _music else 'no music'
+    return (
+        f'{len(_sounds)} resident sound(s), {total / 1024 ** 2:.1f} MiB '
+        f'decoded, {music}')
+
+
 def image_mirror(id_, horizontal=True, vertical=False):
     if not _image_store.get(id_):
         raise ValueError(f'Unknown image id {id_}. Cannot generate a mirror.')
@@ -406,6 +607,39 @@ def image_mirror(id_, horizontal=True, vertical=False):
     return flip_id
 
 
+def image_effect(id_, effect, color, alpha=None):
+    """
+    Derived images are generated once and stored in the image store, next to
+    their source like the mirrors. Effects:
+    - 'add': the color is added to the image.
+    - 'mult': the image is multiplied by the color.
+    - 'silhouette': the color is multiplied by the image, alpha included.
+    """
+    if not _image_store.get(id_):
+        raise ValueError(f'Unknown image id {id_}. Cannot apply an effect.')
+    color = tuple(color)
+    effect_id = f'{id_}[{effect}{color}{alpha}]'
+    if _image_store.get(effect_id):
+        return effect_id
+    image = _image_store[id_]
+    if effect == 'add':
+        derived = image.copy()
+        derived.fill(color, special_flags=pygame.BLEND_ADD)
+    elif effect == 'mult':
+        derived = image.copy()
+        derived.fill(color, special_flags=pygame.BLEND_MULT)
+    elif effect == 'silhouette':
+        derived = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+        derived.fill(color)
+        derived.blit(image, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+    else:
+        raise ValueError(f'Unknown image effect {effect}.')
+    if alpha is not None:
+        derived.set_alpha(alpha)
+    _image_store[effect_id] = derived
+    return effect_id
+
+
 def build_winner_message(score):
     victory = score['victory']
     roundswon = get_scoresheet_text('roundswon').format(number=victory)
@@ -1,178 +1,196 @@
 from ragtimerumble.config import DIRECTIONS
 
 
+KEYS = (
+    'A', 'B', 'X', 'Y', 'L1', 'L2', 'R1', 'R2', 'select', 'start', 'LSB',
+    'RSB', 'UP', 'DOWN', 'LEFT', 'RIGHT', 'RS_LEFT', 'RS_RIGHT', 'RS_UP',
+    'RS_DOWN')
+KEY_BITS = {key: 1 << i for i, key in enumerate(KEYS)}
+
+# Controller mappings as {key: inputs}, a key is pressed when any of its
+# inputs is. Inputs are:
+# - ('button', index, None): the button is pressed.
+# - ('axis', index, sign): the axis is pushed over .5 in the sign direction.
+# - ('hat', index, value): the hat 0 coordinate index equals the value.
+X_INPUT_MAPPING = {
+    'A': (('button', 0, None),),
+    'B': (('button', 1, None),),
+    'X': (('button', 2, None),),
+    'Y': (('button', 3, None),),
+    'L1': (('button', 4, None),),
+    'L2': (('axis', 4, 1),),
+    'R1': (('button', 5, None),),
+    'R2': (('axis', 5, 1),),
+    'select': (('button', 6, None),),
+    'start': (('button', 7, None),),
+    'LSB': (('button', 8, None),),
+    'RSB': (('button', 9, None),),
+    'UP': (('hat', 1, 1), ('axis', 1, -1)),
+    'DOWN': (('hat', 1, -1), ('axis', 1, 1)),
+    'LEFT': (('hat', 0, -1), ('axis', 0, -1)),
+    'RIGHT': (('hat', 0, 1), ('axis', 0, 1)),
+    'RS_LEFT': (('axis', 2, -1),),
+    'RS_RIGHT': (('axis', 2, 1),),
+    'RS_UP': (('axis', 3, -1),),
+    'RS_DOWN': (('axis', 3, 1),),
+}
+
+TWO_AXIS_EIGHT_BUTTON_MAPPING = {
+    'A': (('button', 1, None),),
+    'X': (('button', 3, None),),
+    'select': (('button', 6, None),),
+    'start': (('button', 7, None),),
+    'UP': (('axis', 1, -1),),
+    'DOWN': (('axis', 1, 1),),
+    'LEFT': (('axis', 0, -1),),
+    'RIGHT': (('axis', 0, 1),),
+}
+
+PS4_CONTROLLER_MAPPING = {
+    'A': (('button', 0, None),),
+    'X': (('button', 2, None),),
+    'Y': (('button', 3, None),),
+    'B': (('button', 1, None),),
+    'select': (('button', 4, None),),
+    'start': (('button', 6, None),),
+    'UP': (('button', 11, None), ('axis', 1, -1)),
+    'DOWN': (('button', 12, None), ('axis', 1, 1)),
+    'LEFT': (('button', 13, None), ('axis', 0, -1)),
+    'RIGHT': (('button', 14, None), ('axis', 0, 1)),
+    'RS_LEFT': (('axis', 2, -1),),
+    'RS_RIGHT': (('axis', 2, 1),),
+    'RS_UP': (('axis', 3, -1),),
+    'RS_DOWN': (('axis', 3, 1),),
+}
+
+GENERIC_USB_JOYSTICK_MAPPING = {
+    'A': (('button', 2, None),),
+    'X': (('button', 3, None),),
+    'Y': (('button', 0, None),),
+    'select': (('button', 6, None),),
+    'start': (('button', 9, None),),
+    'UP': (('hat', 1, 1), ('axis', 1, -1)),
+    'DOWN': (('hat', 1, -1), ('axis', 1, 1)),
+    'LEFT': (('hat', 0, -1), ('axis', 0, -1)),
+    'RIGHT': (('hat', 0, 1), ('axis', 0, 1)),
+    'RS_LEFT': (('axis', 2, -1),),
+    'RS_RIGHT': (('axis', 2, 1),),
+    'RS_UP': (('axis', 4, -1),),
+    'RS_DOWN': (('axis', 4, 1),),
+}
+
+NAME_TO_MAPPING = {
+    'XBox One S Controller': X_INPUT_MAPPING,
+    'Controller (8BitDo Pro 2)': X_INPUT_MAPPING,
+    'USB,2-axis 8-button gamepad': TWO_AXIS_EIGHT_BUTTON_MAPPING,
+    'Generic USB Joystick': GENERIC_USB_JOYSTICK_MAPPING,
+    'PS4 Controller': PS4_CONTROLLER_MAPPING,
+}
+
+
+_mappings = {}
+_snapshots = {}
+
+
+class Commands:
+    """
+    Read only view of a joystick snapshot, usable like the {key: pressed}
+    dict it replaces.
+    """
+    __slots__ = 'mask',
+
+    def __init__(self, mask):
+        self.mask = mask
+
+    def __getitem__(self, key):
+        return bool(self.mask & KEY_BITS[key])
+
+    def get(self, key, default=None):
+        bit = KEY_BITS.get(key)
+        if bit is None:
+            return default
+        return bool(self.mask & bit)
+
+
+def get_joystick_mapping(joystick):
+    """
+    The controller mapping is resolved once per device as a list of
+    (key bit, inputs).
+    """
+    instance_id = joystick.get_instance_id()
+    mapping = _mappings.get(instance_id)
+    if mapping is None:
+        inputs = NAME_TO_MAPPING.get(joystick.get_name(), X_INPUT_MAPPING)
+        mapping = [(KEY_BITS[key], inputs[key]) for key in inputs]
+        _mappings[instance_id] = mapping
+    return mapping
+
+
+def sample_joystick(joystick):
+    """
+    Read the state of every key of the joystick as a bitmask (see KEY_BITS).
+    """
+    mask = 0
+    hat = None
+    for bit, inputs in get_joystick_mapping(joystick):
+        for kind, index, value in inputs:
+            if kind == 'button':
+                pressed = joystick.get_button(index) == 1
+            elif kind == 'axis':
+                pressed = joystick.get_axis(index) * value > .5
+            else:
+                hat = hat or joystick.get_hat(0)
+                pressed = hat[index] == value
+            if pressed:
+                mask |= bit
+                break
+    return mask
+
+
+def sample_joysticks(joysticks):
+    """
+    Sample all the joysticks once for the current tick. Every command read
+    during the tick comes from these snapshots. The bitmasks are returned in
+    the joysticks order.
+    """
+    _snapshots.clear()
+    for joystick in joysticks:
+        _snapshots[joystick.get_instance_id()] = sample_joystick(joystick)
+    return tuple(_snapshots[j.get_instance_id()] for j in joysticks)
+
+
+def set_snapshots(joysticks, masks):
+    """
+    Replace the sampling of the tick by given bitmasks (e.g. from a replay).
+    """
+    _snapshots.clear()
+    for joystick, mask in zip(joysticks, masks):
+        _snapshots[joystick.get_instance_id()] = mask
+
+
+def get_snapshot(joystick):
+    instance_id = joystick.get_instance_id()
+    mask = _snapshots.get(instance_id)
+    if mask is None:
+        mask = sample_joystick(joystick)
+        _snapshots[instance_id] = mask
+    return mask
+
+
 def get_keystate(key_name, joystick):
-    name_to_function = {
-        'XBox One S Controller': get_x_input_keystate,
-        'Controller (8BitDo Pro 2)': get_x_input_keystate,
-        'USB,2-axis 8-button gamepad': get_2_axis_8_button_keystate,
-        'Generic USB Joystick': get_generic_user_joystick_keystate,
-        'PS4 Controller': get_ps4_controller_keystate
-    }
-    function = name_to_function.get(joystick.get_name(), get_x_input_keystate)
-    return function(key_name, joystick)
-
-
-def get_2_axis_8_button_keystate(key_name, joystick):
-    match key_name:
-        case "A":
-            return joystick.get_button(1) == 1
-        case 'X':
-            return joystick.get_button(3) == 1
-        case 'select':
-            return joystick.get_button(6) == 1
-        case 'start':
-            return joystick.get_button(7) == 1
-        case 'UP':
-            return joystick.get_axis(1) < -.5
-        case 'DOWN':
-            return joystick.get_axis(1) > .5
-        case 'LEFT':
-            return joystick.get_axis(0) < -.5
-        case 'RIGHT':
-            return joystick.get_axis(0) > .5
-    return False
-
-
-def get_ps4_controller_keystate(key_name, joystick):
-    match key_name:
-        case "A":
-            return joystick.get_button(0) == 1
-        case 'X':
-            return joystick.get_button(2) == 1
-        case 'Y':
-            return joystick.get_button(3) == 1
-        case 'B':
-            return joystick.get_button(1) == 1
-        case 'select':
-            return joystick.get_button(4) == 1
-        case 'start':
-            return joystick.get_button(6) == 1
-        case 'UP':
-            return joystick.get_button(11) == 1 or joystick.get_axis(1) < -.5
-        case 'DOWN':
-            return joystick.get_button(12) == 1 or joystick.get_axis(1) > .5
-        case 'LEFT':
-            return joystick.get_button(13) == 1 or joystick.get_axis(0) < -.5
-        case 'RIGHT':
-            return joystick.get_button(14) == 1 or joystick.get_axis(0) > .5
-        case 'RS_LEFT':
-            return joystick.get_axis(2) < -.5
-        case 'RS_RIGHT':
-            return joystick.get_axis(2) > .5
-        case 'RS_UP':
-            return joystick.get_axis(3) < -.5
-        case 'RS_DOWN':
-            return joystick.get_axis(3) > .5
-    return False
-
-
-def get_generic_user_joystick_keystate(key_name, joystick):
-    match key_name:
-        case "A":
-            return joystick.get_button(2) == 1
-        case 'X':
-            return joystick.get_button(3) == 1
-        case 'Y':
-            return joystick.get_button(0) == 1
-        case 'select':
-            return joystick.get_button(6) == 1
-        case 'start':
-            return joystick.get_button(9) == 1
-        case 'UP':
-            return joystick.get_hat(0)[1] == 1 or joystick.get_axis(1) < -.5
-        case 'DOWN':
-            return joystick.get_hat(0)[1] == -1 or joystick.get_axis(1) > .5
-        case 'LEFT':
-            return joystick.get_hat(0)[0] == -1 or joystick.get_axis(0) < -.5
-        case 'RIGHT':
-            return joystick.get_hat(0)[0] == 1 or joystick.get_axis(0) > .5
-        case 'RS_LEFT':
-            return joystick.get_axis(2) < -.5
-        case 'RS_RIGHT':
-            return joystick.get_axis(2) > .5
-        case 'RS_UP':
-            return joystick.get_axis(4) < -.5
-        case 'RS_DOWN':
-            return joystick.get_axis(4) > .5
-    return False
-
-
-def get_x_input_keystate(key_name, joystick):
-    match key_name:
-        case "A":
-            return joystick.get_button(0) == 1
-        case 'B':
-            return joystick.get_button(1) == 1
-        case 'X':
-            return joystick.get_button(2) == 1
-        case 'Y':
-            return joystick.get_button(3) == 1
-        case 'L1':
-            return joystick.get_button(4) == 1
-        case 'L2':
-            return joystick.get_axis(4) > .5
-        case 'R1':
-            return joystick.get_button(5) == 1
-        case 'R2':
-            return joystick.get_axis(5) > .5
-        case 'select':
-            return joystick.get_button(6) == 1
-        case 'start':
-            return joystick.get_button(7) == 1
-        case 'LSB':
-            return joystick.get_button(8) == 1
-        case 'RSB':
-            return joystick.get_button(9) == 1
-        case 'UP':
-            return joystick.get_hat(0)[1] == 1 or joystick.get_axis(1) < -.5
-        case 'DOWN':
-            return joystick.get_hat(0)[1] == -1 or joystick.get_axis(1) > .5
-        case 'LEFT':
-            return joystick.get_hat(0)[0] == -1 or joystick.get_axis(0) < -.5
-        case 'RIGHT':
-            return joystick.get_hat(0)[0] == 1 or joystick.get_axis(0) > .5
-        case 'RS_LEFT':
-            return joystick.get_axis(2) < -.5
-        case 'RS_RIGHT':
-            return joystick.get_axis(2) > .5
-        case 'RS_UP':
-            return joystick.get_axis(3) < -.5
-        case 'RS_DOWN':
-            return joystick.get_axis(3) > .5
-    raise KeyError(f'Unknown key {key_name}')
+    return bool(get_snapshot(joystick) & KEY_BITS[key_name])
 
 
 def get_current_commands(joystick):
-    return {
-        'A': get_keystate('A', joystick),
-        'B': get_keystate('B', joystick),
-        'X': get_keystate('X', joystick),
-        'Y': get_keystate('Y', joystick),
-        'L1': get_keystate('L1', joystick),
-        'L2': get_keystate('L2', joystick),
-        'R1': get_keystate('R1', joystick),
-        'R2': get_keystate('R2', joystick),
-        'select': get_keystate('select', joystick),
-        'start': get_keystate('start', joystick),
-        'LSB': get_keystate('LSB', joystick),
-        'RSB': get_keystate('RSB', joystick),
-        'UP': get_keystate('UP', joystick),
-        'DOWN': get_keystate('DOWN', joystick),
-        'LEFT': get_keystate('LEFT', joystick),
-        'RIGHT': get_keystate('RIGHT', joystick),
-        'RS_LEFT': get_keystate('RS_LEFT', joystick),
-        'RS_RIGHT': get_keystate('RS_RIGHT', joystick),
-        'RS_UP': get_keystate('RS_UP', joystick),
-        'RS_DOWN': get_keystate('RS_DOWN', joystick)
-    }
+    return Commands(get_snapshot(joystick))
 
 
 def get_pressed_direction(joystick, rs=False):
-    left = get_keystate('RS_LEFT' if rs else 'LEFT', joystick)
-    right = get_keystate('RS_RIGHT' if rs else 'RIGHT', joystick)
-    up = get_keystate('RS_UP' if rs else 'UP', joystick)
-    down = get_keystate('RS_DOWN' if rs else 'DOWN', joystick)
+    mask = get_snapshot(joystick)
+    left = mask & KEY_BITS['RS_LEFT' if rs else 'LEFT']
+    right = mask & KEY_BITS['RS_RIGHT' if rs else 'RIGHT']
+    up = mask & KEY_BITS['RS_UP' if rs else 'UP']
+    down = mask & KEY_BITS['RS_DOWN' if rs else 'DOWN']
     if left and down:
         return DIRECTIONS.DOWN_LEFT
     elif left and up:
@@ -6,7 +6,7 @@ from ragtimerumble.config import (
 from ragtimerumble.display import set_screen_display_mode
 from ragtimerumble.coordinates import Coordinates
 from ragtimerumble.io import (
-    load_data, load_image, get_menu_text, play_sound, play_dispatcher_music,
+    load_image, get_menu_text, play_sound, play_dispatcher_music,
     get_how_to_play_image, get_touch_button_image, build_winner_message)
 from ragtimerumble.sprite import SpriteSheet
 from ragtimerumble.joystick import get_pressed_direction, get_current_commands
@@ -381,8 +381,7 @@ class EnumItem:
 class Winner:
     def __init__(self, player_index):
         filepath = f'resources/animdata/p{player_index + 1}-win-animation.json'
-        data = load_data(filepath)
-        self.spritesheet = SpriteSheet(data, start_animation='loop')
+        self.spritesheet = SpriteSheet(filepath, start_animation='loop')
         self.coordinates = Coordinates((235, 128))
 
     @property
@@ -402,8 +401,8 @@ class Winner:
 
 class Title:
     def __init__(self):
-        data = load_data('resources/animdata/title.json')
-        self.spritesheet = SpriteSheet(data, start_animation='waiting')
+        self.spritesheet = SpriteSheet(
+            'resources/animdata/title.json', start_animation='waiting')
         self.loop_cooldown = COUNTDOWNS.TITLE_LOOP_COOLDOWN_MIN
         self.coordinates = Coordinates((0, 0))
 
@@ -0,0 +1,84 @@
+import numpy as np
+
+
+RGB_SHIFTS = 16, 8, 0
+
+
+def pack_color(color, shifts=RGB_SHIFTS):
+    return (
+        (int(color[0]) << shifts[0]) |
+        (int(color[1]) << shifts[1]) |
+        (int(color[2]) << shifts[2]))
+
+
+def build_color_mapping(palette1, palette2, shifts=RGB_SHIFTS):
+    """
+    Resolve the palette swap as {origin: final} packed colors.
+    The swaps apply in palette order, a pixel changed by a swap can be
+    changed again by a following one (A -> B then B -> C gives A -> C).
+    """
+    mapping = {}
+    for color1, color2 in zip(palette1, palette2):
+        color1 = pack_color(color1, shifts)
+        color2 = pack_color(color2, shifts)
+        if color1 == color2:
+            continue
+        for origin, color in mapping.items():
+            if color == color1:
+                mapping[origin] = color2
+        mapping.setdefault(color1, color2)
+    return {
+        origin: color for origin, color in mapping.items()
+        if origin != color}
+
+
+def remap_packed_colors(packed, palette1, palette2, shifts=RGB_SHIFTS):
+    """
+    Swap the colors of an array of packed 32 bits pixels in place, in a
+    single pass. The bits outside of the RGB channels (alpha) are kept.
+    """
+    mapping = build_color_mapping(palette1, palette2, shifts)
+    if not mapping:
+        return
+    keys = np.array(sorted(mapping), dtype=np.uint32)
+    values = np.array([mapping[key] for key in keys.tolist()], np.uint32)
+    rgb_mask = np.uint32(pack_color((255, 255, 255), shifts))
+    colors = packed & rgb_mask
+    indexes = np.searchsorted(keys, colors)
+    np.minimum(indexes, len(keys) - 1, out=indexes)
+    found = keys[indexes] == colors
+    packed[found] = (packed[found] & ~rgb_mask) | values[indexes[found]]
+
+
+def unpack_color(packed, shifts=RGB_SHIFTS):
+    return tuple((packed >> shift) & 255 for shift in shifts)
+
+
+def index_colors(pixels, alpha):
+    """
+    Split an image given as (w, h, 3) RGB and (w, h) alpha arrays in an array
+    of 8 bits color indexes and a table of packed colors. The index 0 is the
+    transparent color.
+    """
+    if np.any((alpha != 0) & (alpha != 255)):
+        raise ValueError('translucent pixels cannot be indexed')
+    rgb = pixels.astype(np.uint32)
+    packed = (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+    opaque = alpha == 255
+    colors, inverse = np.unique(packed[opaque], return_inverse=True)
+    if len(colors) > 255:
+        raise ValueError(f'{len(colors)} colors, 255 maximum')
+    transparents = packed[~opaque]
+    transparent = int(transparents[0]) if len(transparents) else 0
+    indexes = np.zeros(alpha.shape, dtype=np.uint8)
+    indexes[opaque] = inverse + 1
+    return indexes, [transparent] + colors.tolist()
+
+
+def swap_color_table(colors, palette1, palette2):
+    """
+    Apply the palette swap to a table of packed colors and return it as RGB
+    colors, ready for Surface.set_palette.
+    """
+    mapping = build_color_mapping(palette1, palette2)
+    return [unpack_color(mapping.get(color, color)) for color in colors]
@@ -20,13 +20,13 @@ def points_to_direction(p1, p2):
     return HAT_TO_DIRECTION.get((x, y), DIRECTIONS.RIGHT)
 
 
-def equilateral_path(origin, dst):
+def equilateral_path(origin, dst, rng=random):
     dst = list(dst)[:]
     dst[0] = dst[0] if dst[0] is not None else origin[0]
     dst[1] = dst[1] if dst[1] is not None else origin[1]
     if origin[0] in dst or origin[1] in dst:
         return [dst]
-    intermediate = random.choice((
+    intermediate = rng.choice((
         [origin[0], dst[1]],
         [dst[0], origin[1]]))
     return [intermediate, dst]
@@ -36,15 +36,15 @@ def filter_close_paths(point, paths, maxdistance):
     return [path for path in paths if distance(point, path[0]) < maxdistance]
 
 
-def smooth_path_to_path(orig, points):
+def smooth_path_to_path(orig, points, rng=random):
     path = []
     for point in points:
-        path.extend(shortest_path(orig, point))
+        path.extend(shortest_path(orig, point, rng))
         orig = point
     return path
 
 
-def shortest_path(orig, dst):
+def shortest_path(orig, dst, rng=random):
     """
     Create a path between an origin and a destination lock to height
     directions. Function can contains some random to decide the way to use.
@@ -60,7 +60,7 @@ def shortest_path(orig, dst):
     if orig[0] in dst or orig[1] in dst:
         return [dst]
 
-    reverse = random.choice([True, False])
+    reverse = rng.choice([True, False])
     if reverse:
         orig, dst = dst, orig
 
@@ -100,21 +100,21 @@ def choice_destination(scene, position, box):
         limit += 1
 
     x, y = [int(n) for n in position]
-    x = random.randrange(x - 75, x + 75)
-    y = random.randrange(y - 75, y + 75)
+    x = scene.random.randrange(x - 75, x + 75)
+    y = scene.random.randrange(y - 75, y + 75)
     pos = x, y
     while scene.collide(get_box(pos, box)):
         x, y = [int(n) for n in position]
-        x = random.randrange(x - 75, x + 75)
-        y = random.randrange(y - 75, y + 75)
+        x = scene.random.randrange(x - 75, x + 75)
+        y = scene.random.randrange(y - 75, y + 75)
         pos = x, y
     return pos
 
 
-def random_position_in_rect(rect, position=None):
+def random_position_in_rect(rect, position=None, rng=random):
     while True:
-        x = random.choice(range(rect[0], rect[0] + rect[2]))
-        y = random.choice(range(rect[1], rect[1] + rect[3]))
+        x = rng.choice(range(rect[0], rect[0] + rect[2]))
+        y = rng.choice(range(rect[1], rect[1] + rect[3]))
         if position is None:
             return [x, y]
         if is_vertical_segment(position, [x, y]):
@@ -122,7 +122,7 @@ def random_position_in_rect(rect, position=None):
         return x, y
 
 
-def choice_destination_from(targets, point):
+def choice_destination_from(targets, point, rng=random):
     targets = [
         t for t in targets if point_in_rectangle(point, *t['origin'])]
 
@@ -134,7 +134,7 @@ def choice_destination_from(targets, point):
         for _ in range(t['weight'])
         for d in t['destinations']]
 
-    destination = random.choice(destinations)
-    x = random.randrange(destination[0], destination[0] + destination[2])
-    y = random.randrange(destination[1], destination[1] + destination[3])
+    destination = rng.choice(destinations)
+    x = rng.randrange(destination[0], destination[0] + destination[2])
+    y = rng.randrange(destination[1], destination[1] + destination[3])
     return x, y
@@ -1,5 +1,4 @@
 
-import random
 from ragtimerumble import preferences
 from ragtimerumble.joystick import get_pressed_direction, get_current_commands
 from ragtimerumble.config import (
@@ -259,6 +258,7 @@ class PokerIterator:
 
     def bet(self):
         win, loose = WIN_OR_LOOSE_AT_POKER_PROBABILITY
-        victory = random.choice([True] * win + [False] * loose)
+        victory = self.player.scene.random.choice(
+            [True] * win + [False] * loose)
         self.player.coins += 1 if victory else -1
         self.balance += 1 if victory else -1
\ No newline at end of file
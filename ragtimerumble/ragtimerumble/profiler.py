@@ -0,0 +1,123 @@
+import json
+import time
+from collections import deque
+from ragtimerumble.config import PROFILER_TRACE_MAX_EVENTS, PROFILER_WINDOW
+
+
+enabled = False
+
+# Durations (ns) summed per scope over the current frame.
+_frame = {}
+# Last PROFILER_WINDOW frames durations (ns) per scope.
+_history = {}
+# Chrome trace events as (name, start ns, duration ns), the oldest events
+# are dropped past PROFILER_TRACE_MAX_EVENTS.
+_events = deque(maxlen=PROFILER_TRACE_MAX_EVENTS)
+_origin = time.perf_counter_ns()
+
+
+class Scope:
+    """
+    Time the code run inside the with statement.
+    """
+    __slots__ = 'name', 'start'
+
+    def __init__(self, name):
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *_):
+        duration = time.perf_counter_ns() - self.start
+        _frame[self.name] = _frame.get(self.name, 0) + duration
+        _events.append((self.name, self.start, duration))
+        return False
+
+
+class NullScope:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *_):
+        return False
+
+
+NULL_SCOPE = NullScope()
+
+
+def scope(name):
+    """
+    with profiler.scope('scene.npcs'):
+        ...
+    When the profiler is disabled, a shared scope doing nothing is returned:
+    the cost is a function call.
+    """
+    if not enabled:
+        return NULL_SCOPE
+    return Scope(name)
+
+
+def enable():
+    global enabled, _origin
+    enabled = True
+    _origin = time.perf_counter_ns()
+
+
+def next_frame():
+    """
+    Close the current frame: its durations feed the rolling statistics.
+    """
+    if not enabled:
+        return
+    for name in _history.keys() | _frame.keys():
+        history = _history.get(name)
+        if history is None:
+            history = _history[name] = deque(maxlen=PROFILER_WINDOW)
+        history.append(_frame.get(name, 0))
+    _frame.clear()
+
+
+def get_stats():
+    """
+    Milliseconds per frame over the last PROFILER_WINDOW frames, as
+    {scope name: (last, mean, p95, max)} sorted by name.
+    """
+    stats = {}
+    for name in sorted(_history):
+        durations = sorted(_history[name])
+        p95 = durations[min(len(durations) - 1, len(durations) * 95 // 100)]
+        stats[name] = (
+            _history[name][-1] / 1e6,
+            sum(durations) / len(durations) / 1e6,
+            p95 / 1e6,
+            durations[-1] / 1e6)
+    return stats
+
+
+def report():
+    lines = [f'{"scope":<28}{"mean":>9}{"p95":>9}{"max":>9}  (ms/frame)']
+    for name, (_, mean, p95, maximum) in get_stats().items():
+        lines.append(f'{name:<28}{mean:>9.3f}{p95:>9.3f}{maximum:>9.3f}')
+    return '\n'.join(lines)
+
+
+def dump_trace(filepath):
+    """
+    Save the recorded scopes as a chrome://tracing / Perfetto json trace.
+    """
+    events = [
+        {
+            'name': name,
+            'cat': name.split('.')[0],
+            'ph': 'X',
+            'ts': (start - _origin) / 1000,
+            'dur': duration / 1000,
+            'pid': 1,
+            'tid': 1}
+        for name, start, duration in _events]
+    with open(filepath, 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
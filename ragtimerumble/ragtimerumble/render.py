@@ -1,18 +1,23 @@
 
 import math
 import pygame
+from bisect import bisect_right
 from ragtimerumble import debug
 from ragtimerumble import preferences
+from ragtimerumble import profiler
 from ragtimerumble.character import Character
-from ragtimerumble.config import LOOP_STATUSES, DIRECTIONS
+from ragtimerumble.config import (
+    LOOP_STATUSES, DIRECTIONS, SURFACE_POOL_MAX_IDLE_FRAMES)
 from ragtimerumble.gameloop import column_to_group
 from ragtimerumble.io import (
-    get_image, get_font, load_image, get_coin_stack, get_score_player_icon,
+    get_image, load_font, load_image, get_coin_stack, get_score_player_icon,
     get_round_image, get_round_total_image, get_scoresheet_text,
-    get_build_name, get_menu_text, get_game_over_header)
+    get_build_name, get_menu_text, get_game_over_header, render_text,
+    image_effect)
 from ragtimerumble.menu import ControlMenuScreen, HowToPlayScreen
 from ragtimerumble.pathfinding import distance, seg_to_vector
 from ragtimerumble.pilot import SmoothPathPilot
+from ragtimerumble.renderlist import STATIC_LAYERS
 from ragtimerumble.scene import Vfx
 from ragtimerumble.scores import get_score_data
 
@@ -21,6 +26,8 @@ KILL_MESSAGE_SCREEN_PADDING = 10
 KILL_MESSAGE_PADDING = 1
 KILL_MESSAGE_MARGIN = 2
 MESSAGE_FONT_SIZE = 8
+PROFILER_COLUMN_SPACING = 6
+PROFILER_FONT_SIZE = 8
 MESSAGE_FONT_FILE = 'Pixel-Western.otf'
 TEXT_FONT_FILE = 'Retro-Gaming.ttf'
 LOSER_POSITIONS = [(125, 240), (305, 240), (490, 240)]
@@ -39,8 +46,69 @@ BLENDMODES = {
 }
 
 
+class SurfacePool:
+    """
+    Scratch surfaces reused across frames. The surfaces are handed out
+    cleared, by size and flags, and all given back at the start of the next
+    frame. Surfaces unused for SURFACE_POOL_MAX_IDLE_FRAMES are dropped.
+    """
+
+    def __init__(self):
+        self.frame = 0
+        self.free = {}
+        self.used = []
+        self.allocations = 0
+        self.frame_allocations = 0
+        self.last_frame_allocations = 0
+
+    def get(self, size, flags=0):
+        key = (int(size[0]), int(size[1])), flags
+        surfaces = self.free.get(key)
+        if surfaces:
+            surface, _ = surfaces.pop()
+            surface.fill((0, 0, 0, 0))
+            # set_alpha(None) would drop the SRCALPHA flag.
+            surface.set_alpha(255 if flags & pygame.SRCALPHA else None)
+        else:
+            surface = pygame.Surface(*key)
+            self.allocations += 1
+            self.frame_allocations += 1
+        self.used.append((key, surface))
+        return surface
+
+    def next_frame(self):
+        for key, surface in self.used:
+            self.free.setdefault(key, []).append((surface, self.frame))
+        self.used.clear()
+        self.frame += 1
+        self.last_frame_allocations = self.frame_allocations
+        self.frame_allocations = 0
+        oldest = self.frame - SURFACE_POOL_MAX_IDLE_FRAMES
+        for key, surfaces in list(self.free.items()):
+            surfaces = [item for item in surfaces if item[1] >= oldest]
+            if surfaces:
+                self.free[key] = surfaces
+            else:
+                del self.free[key]
+
+    def report(self):
+        return (
+            f'{self.allocations} scratch surface(s) allocated, '
+            f'{self.last_frame_allocations} on last frame')
+
+
+SURFACE_POOL = SurfacePool()
+
+
 def render_game(screen, loop):
-    render_scene(screen, loop.scene)
+    SURFACE_POOL.next_frame()
+    with profiler.scope('render.scene'):
+        render_scene(screen, loop.scene)
+    with profiler.scope(f'render.{loop.status}'):
+        render_overlays(screen, loop)
+
+
+def render_overlays(screen, loop):
     if loop.status == LOOP_STATUSES.MENU:
         return render_menu(screen, loop.menu)
     if loop.status == LOOP_STATUSES.PAUSE:
@@ -59,14 +127,15 @@ def render_game(screen, loop):
             render_black_screen(screen, 180)
             buttons = loop.dispatcher.back_to_menu_buttons
             render_buttons(screen, buttons, (4, 335))
-    render_messages(screen, loop.scene)
+    with profiler.scope('render.messages'):
+        render_messages(screen, loop.scene)
 
 
 def render_pause_menu(screen, pause_menu):
     render_black_screen(screen, 180)
     bg = get_image(pause_menu.bg)
     screen.blit(bg, (0, 0))
-    font = pygame.font.Font(get_font(TEXT_FONT_FILE), 11)
+    font = load_font(TEXT_FONT_FILE, 11)
     for item in pause_menu.items:
         highlighted = item.index == pause_menu.index
         color = (255, 125, 0) if highlighted else (255, 255, 255)
@@ -87,7 +156,7 @@ def render_menu(screen, menu):
         return SUBSCREEN_RENDERER[type(menu.subscreen)](screen, menu)
     render_element(screen, menu.title)
     render_build(screen, get_build_name())
-    font = pygame.font.Font(get_font(TEXT_FONT_FILE), 11)
+    font = load_font(TEXT_FONT_FILE, 11)
     for item in menu.items:
         highlighted = item.index == menu.index
         color = (255, 125, 0) if highlighted else (255, 255, 255)
@@ -100,7 +169,7 @@ def render_menu(screen, menu):
 
 
 def render_build(screen, name):
-    font = pygame.font.Font(get_font(TEXT_FONT_FILE), 11)
+    font = load_font(TEXT_FONT_FILE, 11)
     draw_text(screen, name, (5, 350), color=(50, 50, 50), font=font)
 
 
@@ -129,10 +198,10 @@ def render_button(screen, button, pos):
     button_image = get_image(button.image)
     screen.blit(button_image, pos)
     text = get_menu_text(button.key)
-    font = pygame.font.Font(get_font(MESSAGE_FONT_FILE), 8)
+    font = load_font(MESSAGE_FONT_FILE, 8)
     x = pos[0] + button_image.get_size()[0] + 3
     y = pos[1] + (button_image.get_size()[1] / 2)
-    text = font.render(text, False, color)
+    text = render_text(font, text, color)
     text_rect = text.get_rect(center=(x, y))
     text_rect.left += text_rect.width / 2
 
@@ -183,12 +252,10 @@ def render_score_header(screen, scores_screen, winner):
     for player in scores_screen.players:
         # Draw character avatar.
         position = scores_screen.characters_coordinates[player.index].position
-        image = draw_winner_avatar(screen, player, position)
+        id_ = draw_winner_avatar(screen, player, position)
         # Draw character avatar dead filter
         if player.index != winner:
-            image = image.copy()
-            image.fill((60, 60, 60), special_flags=pygame.BLEND_MULT)
-            image.set_alpha(150)
+            image = get_image(image_effect(id_, 'mult', (60, 60, 60), 150))
             screen.blit(image, position)
         else:  # Set winner title.
             winner_title = f'{player.character.display_name} wins!'
@@ -198,7 +265,7 @@ def render_score_header(screen, scores_screen, winner):
         left = scores_screen.columns[player.index][0]
         top = 121 - image.get_size()[0]
         screen.blit(image, (left, top))
-    font = pygame.font.Font(get_font(MESSAGE_FONT_FILE), 14)
+    font = load_font(MESSAGE_FONT_FILE, 14)
     draw_text(
         surface=screen,
         text=winner_title,
@@ -209,7 +276,7 @@ def render_score_header(screen, scores_screen, winner):
 
 def render_end_game(screen, scores_screen, winner):
     render_game_over_header(screen)
-    font = pygame.font.Font(get_font(TEXT_FONT_FILE), 11)
+    font = load_font(TEXT_FONT_FILE, 11)
     loser_index = 0
     for player in scores_screen.players:
         if player.index != winner:
@@ -250,13 +317,13 @@ def draw_winner_avatar(screen, player, position):
     id_ = player.character.spritesheet.image(direction, palette)
     image = get_image(id_)
     screen.blit(image, position)
-    return image
+    return id_
 
 
 def render_total_score_content(screen, scores_screen):
     image = get_image(load_image('resources/ui/scores/separator-2.png'))
     screen.blit(image, (0, 0))
-    font = pygame.font.Font(get_font(TEXT_FONT_FILE), 11)
+    font = load_font(TEXT_FONT_FILE, 11)
     margin = 8
     for player in scores_screen.players:
         score = scores_screen.scores[f'player {player.index + 1}']
@@ -358,8 +425,8 @@ def render_total_score_content(screen, scores_screen):
 def render_round_score_content(screen, scores_screen, winner):
     image = get_image(load_image('resources/ui/scores/separator-1.png'))
     screen.blit(image, (0, 0))
-    font = pygame.font.Font(get_font(TEXT_FONT_FILE), 11)
-    font_name = pygame.font.Font(get_font(MESSAGE_FONT_FILE), 8)
+    font = load_font(TEXT_FONT_FILE, 11)
+    font_name = load_font(MESSAGE_FONT_FILE, 8)
 
     for player in scores_screen.players:
         # Draw player name
@@ -537,13 +604,13 @@ def render_last_kill(screen, loop):
     if loop.scene.white_screen_countdown:
         screen.fill((255, 255, 255))
     else:
-        temp = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
+        temp = SURFACE_POOL.get(screen.get_size(), pygame.SRCALPHA)
         temp.fill((0, 0, 0))
         temp.set_alpha(180)
         screen.blit(temp, (0, 0))
     for player in loop.scene.players:
         render_element(screen, player.character)
-        font = pygame.font.Font(get_font(TEXT_FONT_FILE), 11)
+        font = load_font(TEXT_FONT_FILE, 11)
         x, y = player.character.coordinates.position
         y += 15
         draw_text(screen, f'player {player.index + 1}', (x, y), font=font)
@@ -568,8 +635,8 @@ def draw_texts(
 def draw_text(
         surface, text, pos, size=15, font=None, color=None, align='left'):
     color = color or (255, 255, 255)
-    font = font or pygame.font.SysFont('Consolas', size)
-    text = font.render(text, False, color)
+    font = font or load_font(size=size)
+    text = render_text(font, text, color)
     text_rect = text.get_rect(center=pos)
     if align == 'left':
         text_rect.left += text_rect.width / 2
@@ -581,7 +648,7 @@ def draw_text(
 
 
 def render_black_screen(surface, alpha):
-    temp = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
+    temp = SURFACE_POOL.get(surface.get_size(), pygame.SRCALPHA)
     temp.fill((0, 0, 0))
     temp.set_alpha(alpha)
     surface.blit(temp, (0, 0))
@@ -589,10 +656,12 @@ def render_black_screen(surface, alpha):
 
 def render_dispatching(screen, loop):
     render_black_screen(screen, 180)
-    elements = [p for p in loop.scene.props if p.visible_at_dispatch]
-    elements += loop.scene.characters
-    for element in sorted(elements, key=lambda elt: elt.switch):
-        render_element(screen, element)
+    for element in loop.scene.elements:
+        dispatched = (
+            isinstance(element, Character) or
+            getattr(element, 'visible_at_dispatch', False))
+        if dispatched:
+            render_element(screen, element)
     gamepad_image = get_image('resources/ui/gamepad.png')
     offset_x = gamepad_image.get_size()[0] / 2
     offset_y = gamepad_image.get_size()[1] / 2
@@ -611,15 +680,15 @@ def render_dispatching(screen, loop):
         screen.blit(gamepad_image, (x, y))
         x = position[0] + gamepad_image.get_size()[0]
         y = position[1]
-        font = pygame.font.Font(get_font(TEXT_FONT_FILE), 8)
+        font = load_font(TEXT_FONT_FILE, 8)
         draw_text(screen, str(i + 1), (x, y), font=font)
         column_counts[column] += 1
 
 
 def render_no_player(screen):
     color = 255, 255, 255
-    font = pygame.font.Font(get_font(MESSAGE_FONT_FILE), 30)
-    text = font.render('no pad detected', True, color)
+    font = load_font(MESSAGE_FONT_FILE, 30)
+    text = render_text(font, 'no pad detected', color, antialias=True)
     x, y = screen.get_size()
     text_rect = text.get_rect(center=(x / 2, y / 2))
     screen.blit(text, text_rect)
@@ -630,54 +699,51 @@ def render_scene(screen, scene):
     if scene.black_screen_countdown or scene.white_screen_countdown:
         render_death_screen(screen, scene)
         return
-    # Background.
-    for background in scene.backgrounds:
-        screen.blit(get_image(background.image), background.position)
-    duel_surface = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
-    # Duel.
-    duel_surface.set_alpha(50)
-    for character in scene.characters:
-        if character.duel_target:
-            pos1 = character.coordinates.position
-            pos2 = character.duel_target.coordinates.position
-            pygame.draw.line(duel_surface, (255, 255, 0), pos1, pos2, 6)
-    screen.blit(duel_surface, (0, 0))
-    # Background.
-    elements = sorted(scene.elements, key=lambda elt: elt.switch)
-    for element in elements:
-        render_element(screen, element)
+    with profiler.scope('render.static_layer'):
+        duelists = [c for c in scene.characters if c.duel_target]
+        duel_surface, duel_rects = draw_duel_lines(
+            screen.get_size(), duelists)
+        if debug.active or debug.render_path:
+            # Debug shapes aren't baked, render everything.
+            for background in scene.backgrounds:
+                screen.blit(get_image(background.image), background.position)
+            screen.blit(duel_surface, (0, 0))
+            for element in scene.elements:
+                render_element(screen, element)
+        else:
+            render_static_layer(screen, scene, duel_surface, duel_rects)
     # Possible duel.
-    duel_surface = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
-    duel_surface.set_alpha(50)
-    done = []
-    for character1, character2 in scene.possible_duels:
-        draw_line = [character2, character1] not in done
-        draw_possible_duel(duel_surface, character1, character2, draw_line)
-        done.append([character1, character2])
-    screen.blit(duel_surface, (0, 0))
+    with profiler.scope('render.possible_duels'):
+        duel_surface = SURFACE_POOL.get(screen.get_size(), pygame.SRCALPHA)
+        duel_surface.set_alpha(50)
+        done = []
+        for character1, character2 in scene.possible_duels:
+            draw_line = [character2, character1] not in done
+            draw_possible_duel(
+                duel_surface, character1, character2, draw_line)
+            done.append([character1, character2])
+        screen.blit(duel_surface, (0, 0))
     # Sniper
-    render_sniper_reticles(screen, scene)
-    characters = {
-        character for reticle in scene.sniperreticles
-        for character in reticle.target_characters}
-    for character in characters:
-        image = get_image(character.image).copy()
-        image.fill((255, 255, 255), special_flags=pygame.BLEND_ADD)
-        image.set_alpha(50)
-        screen.blit(image, character.render_position)
+    with profiler.scope('render.sniper_reticles'):
+        render_sniper_reticles(screen, scene)
+        characters = {
+            character for reticle in scene.sniperreticles
+            for character in reticle.target_characters}
+        for character in characters:
+            id_ = image_effect(character.image, 'add', (255, 255, 255), 50)
+            screen.blit(get_image(id_), character.render_position)
     # Scores.
-    render_players_ol_score(screen, scene)
-
-    for character in scene.characters:
-        shadow_zone = character.shadow_zone()
-        if shadow_zone is None:
-            continue
-        original = get_image(character.image)
-        silhouette = pygame.Surface(original.get_size(), pygame.SRCALPHA)
-        silhouette.fill(shadow_zone['color'])
-        silhouette.blit(original, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-
-        screen.blit(silhouette, character.render_position)
+    with profiler.scope('render.players_ol_score'):
+        render_players_ol_score(screen, scene)
+
+    with profiler.scope('render.shadows'):
+        for character in scene.characters:
+            shadow_zone = character.shadow_zone()
+            if shadow_zone is None:
+                continue
+            id_ = image_effect(
+                character.image, 'silhouette', shadow_zone['color'])
+            screen.blit(get_image(id_), character.render_position)
 
     if not debug.active:
         return
@@ -692,6 +758,119 @@ def render_scene(screen, scene):
         draw_rect(screen, zone.attraction, 25)
 
 
+def draw_duel_lines(size, duelists):
+    duel_surface = SURFACE_POOL.get(size, pygame.SRCALPHA)
+    duel_surface.set_alpha(50)
+    rects = []
+    for character in duelists:
+        pos1 = character.coordinates.position
+        pos2 = character.duel_target.coordinates.position
+        rects.append(
+            pygame.draw.line(duel_surface, (255, 255, 0), pos1, pos2, 6))
+    return duel_surface, rects
+
+
+def render_static_layer(screen, scene, duel_surface, duel_rects):
+    """
+    Render the backgrounds, the duel lines and the scene elements using the
+    pre-composited static layer. The layer is baked on the first frame of the
+    round and baked again only when the static set changed or when an
+    element moved behind a baked one.
+    """
+    scene.render_list.update()
+    layer = scene.static_layer
+    if layer is None or not layer.is_valid(scene):
+        excluded = layer.excluded if layer else None
+        layer = StaticLayer(screen, scene, excluded)
+        scene.static_layer = layer
+    baked = layer.baked
+    if any(rect.collidelist(layer.rects) != -1 for rect in duel_rects):
+        # Duel lines go under every element, including the baked ones.
+        screen.blit(layer.background, (0, 0))
+        baked = ()
+    else:
+        screen.blit(layer.surface, (0, 0))
+    screen.blit(duel_surface, (0, 0))
+    for element in scene.render_list:
+        if id(element) in baked:
+            continue
+        crop = layer.crops.get(id(element))
+        if crop:
+            area, position = crop
+            screen.blit(get_image(element.image), position, area)
+        else:
+            render_element(screen, element)
+
+
+class StaticLayer:
+    """
+    Backgrounds and static elements composited in a single surface.
+    A static element is baked only if none of the elements drawn before it
+    overlaps it: drawing it first then doesn't change the result.
+    Elements once left out stay out until the static set changes, so the
+    layer can't be baked back and forth as characters walk around.
+    Static elements are also cropped to their opaque area when they have to
+    be drawn: overlays are often full screen images mostly transparent.
+    """
+
+    def __init__(self, screen, scene, excluded=None):
+        self.excluded = set(excluded or ())
+        self.baked = set()
+        self.crops = {}
+        # Sprites frames all have the same size, cache it for the checks.
+        self.sizes = {}
+        self.keys = []
+        self.rects = []
+        for background in scene.backgrounds:
+            screen.blit(get_image(background.image), background.position)
+        self.background = screen.copy()
+        drawn_after = []
+        render_list = scene.render_list
+        for key, element in zip(render_list.keys, render_list.elements):
+            if key[1] not in STATIC_LAYERS:
+                drawn_after.append(self.element_rect(element))
+                continue
+            area = get_image(element.image).get_bounding_rect()
+            x, y = element.render_position
+            rect = area.move(int(x), int(y))
+            if getattr(element, 'blendmode', 'normal') == 'normal':
+                self.crops[id(element)] = area, rect.topleft
+            hidden = rect.collidelist(drawn_after) != -1
+            if hidden or id(element) in self.excluded:
+                self.excluded.add(id(element))
+                drawn_after.append(rect)
+                continue
+            render_element(screen, element)
+            self.baked.add(id(element))
+            self.keys.append(key)
+            self.rects.append(rect)
+        self.surface = screen.copy()
+
+    def is_valid(self, scene):
+        # Static elements never move: only check the others against the
+        # baked elements standing in front of them.
+        render_list = scene.render_list
+        for key, element in zip(render_list.keys, render_list.elements):
+            if key[1] in STATIC_LAYERS:
+                continue
+            index = bisect_right(self.keys, key)
+            if index == len(self.keys):
+                continue
+            rect = self.element_rect(element)
+            if rect.collidelist(self.rects[index:]) != -1:
+                return False
+        return True
+
+    def element_rect(self, element):
+        size = self.sizes.get(id(element))
+        if size is None:
+            size = get_image(element.image).get_size()
+            self.sizes[id(element)] = size
+        x, y = element.render_position
+        # Blit positions are truncated, keep a pixel of margin.
+        return pygame.Rect(x - 1, y - 1, size[0] + 2, size[1] + 2)
+
+
 def render_players_ol_score(screen, scene):
     image = get_image(scene.score_ol.image)
     screen.blit(image, scene.score_ol.render_position)
@@ -747,17 +926,12 @@ def render_element(screen, element):
         img = element.image
         m = BLENDMODES[getattr(element, 'blendmode', 'normal')]
         if m:
-            temp = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
-            temp.blit(screen, (0,0))
-            temp.blit(get_image(img), element.render_position, special_flags=m)
-            screen.blit(temp, (0,0))
+            blend_image(screen, get_image(img), element.render_position, m)
         else:
             screen.blit(get_image(img), element.render_position, special_flags=m)
         if hasattr(element, 'shorn') and element.shorn:
-            image = get_image(element.image).copy()
-            image.fill((0, 0, 0), special_flags=pygame.BLEND_MULT)
-            image.set_alpha(150)
-            screen.blit(image, element.render_position)
+            id_ = image_effect(element.image, 'mult', (0, 0, 0), 150)
+            screen.blit(get_image(id_), element.render_position)
     except TypeError:
         print(img, get_image(img), element.render_position)
         raise
@@ -795,10 +969,26 @@ def render_element(screen, element):
                 screen, element.interaction_zone, color='green', alpha=125)
 
 
+def blend_image(screen, image, position, flags):
+    """
+    The blend is applied on an opaque copy of the screen area covered by the
+    image, then blitted back. Working on that area only keeps the cost
+    proportional to the image size.
+    """
+    x, y = int(position[0]), int(position[1])
+    rect = image.get_rect(topleft=(x, y)).clip(screen.get_rect())
+    if not rect.width or not rect.height:
+        return
+    temp = SURFACE_POOL.get(rect.size, pygame.SRCALPHA)
+    temp.blit(screen, (0, 0), rect)
+    temp.blit(image, (x - rect.x, y - rect.y), special_flags=flags)
+    screen.blit(temp, rect)
+
+
 def draw_rect(surface, box, color=None, alpha=255):
     color = color or [255, 0, 0]
     x, y, width, height = box
-    temp = pygame.Surface((width, height), pygame.SRCALPHA)
+    temp = SURFACE_POOL.get((width, height), pygame.SRCALPHA)
     pygame.draw.rect(temp, color, [0, 0, width, height])
     temp.set_alpha(alpha)
     surface.blit(temp, (x, y))
@@ -847,9 +1037,12 @@ def draw_dashed_line(surface, color, p1, p2, width=1, dash_length=4):
 
 def render_messages(screen, scene):
     for i, (text, alpha) in enumerate(scene.messenger.data):
-        font = pygame.font.Font(get_font(MESSAGE_FONT_FILE), MESSAGE_FONT_SIZE)
-        text_surface = font.render(text, False, (0, 0, 0))
-        text_surface.set_alpha(alpha)
+        font = load_font(MESSAGE_FONT_FILE, MESSAGE_FONT_SIZE)
+        text_surface = render_text(font, text, (0, 0, 0))
+        if alpha < 255:
+            # Cached texts are shared.
+            text_surface = text_surface.copy()
+            text_surface.set_alpha(alpha)
         text_rect = text_surface.get_rect()
         top = (
             i * (
@@ -859,7 +1052,7 @@ def render_messages(screen, scene):
         text_rect.topright = (screen.get_width(), top)
         text_rect.top += KILL_MESSAGE_SCREEN_PADDING
         text_rect.right -= KILL_MESSAGE_SCREEN_PADDING
-        bg_surface = pygame.Surface((
+        bg_surface = SURFACE_POOL.get((
             text_rect.width + (KILL_MESSAGE_MARGIN * 2),
             text_rect.height + (KILL_MESSAGE_MARGIN * 2)))
         bg_surface.fill((248, 213, 155))
@@ -879,7 +1072,38 @@ def render_sniper_reticles(screen, scene):
         position = list(reticle.coordinates.position)
         position[0] -= img.get_size()[0] / 2
         position[1] -= img.get_size()[1] / 2
-        surface = pygame.Surface(img.get_size(), pygame.SRCALPHA)
+        surface = SURFACE_POOL.get(img.get_size(), pygame.SRCALPHA)
         surface.blit(img, (0, 0))
         surface.set_alpha(100)
         screen.blit(surface, position)
+
+
+def render_profiler(screen):
+    """
+    Frame breakdown of the profiler scopes, in ms: last frame, mean, p95 and
+    max over the rolling window.
+    """
+    font = load_font(TEXT_FONT_FILE, PROFILER_FONT_SIZE)
+    rows = [('scope', 'last', 'mean', 'p95', 'max')]
+    for name, values in profiler.get_stats().items():
+        rows.append((name, *(f'{value:.2f}' for value in values)))
+    # Texts change every frame, they are not kept in the text cache.
+    rows = [
+        [font.render(text, False, (255, 255, 255)) for text in row]
+        for row in rows]
+    widths = [
+        max(row[i].get_width() for row in rows) + PROFILER_COLUMN_SPACING
+        for i in range(len(rows[0]))]
+    line_height = font.get_linesize()
+    background = SURFACE_POOL.get(
+        (sum(widths) + 4, line_height * len(rows) + 4))
+    background.set_alpha(180)
+    screen.blit(background, (0, 0))
+    for i, row in enumerate(rows):
+        top = 2 + i * line_height
+        screen.blit(row[0], (2, top))
+        # Values are right aligned.
+        right = 2 + widths[0]
+        for width, surface in zip(widths[1:], row[1:]):
+            right += width
+            screen.blit(surface, (right - surface.get_width() - 4, top))
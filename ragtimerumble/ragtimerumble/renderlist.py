@@ -0,0 +1,97 @@
+import itertools
+from bisect import bisect_left
+
+
+# Layers only break the ties between elements at the same depth. Their
+# order is the one the scene elements have always been drawn in.
+(
+    CHARACTERS, PROPS, OVERLAYS, SECONDARY_NPCS,
+    INTERACTIVE_PROPS, VFX_OVERLAYS, ANIMATED_VFX) = range(7)
+# Layers whose elements neither move nor animate.
+STATIC_LAYERS = PROPS, OVERLAYS, INTERACTIVE_PROPS, VFX_OVERLAYS
+
+
+class RenderList:
+    """
+    Scene elements sorted by depth (their switch value).
+    The list is maintained incrementally instead of being sorted at every
+    frame: static elements are inserted once and the moving ones are only
+    re-inserted when their switch value changed since the last update.
+    """
+
+    def __init__(self):
+        self.keys = []
+        self.elements = []
+        self.element_keys = {}
+        # [element, key] pairs, the key being updated in place.
+        self.moving_entries = []
+        self.counter = itertools.count()
+
+    def __iter__(self):
+        return iter(self.elements)
+
+    def __len__(self):
+        return len(self.elements)
+
+    def add(self, element, layer, moving=False):
+        key = (element.switch, layer, next(self.counter))
+        index = bisect_left(self.keys, key)
+        self.keys.insert(index, key)
+        self.elements.insert(index, element)
+        self.element_keys[id(element)] = key
+        if moving:
+            self.moving_entries.append([element, key])
+
+    def remove(self, element):
+        key = self.element_keys.pop(id(element), None)
+        if key is None:
+            return
+        index = bisect_left(self.keys, key)
+        del self.keys[index]
+        del self.elements[index]
+        self.moving_entries = [
+            entry for entry in self.moving_entries if entry[0] is not element]
+
+    def clear(self, layers=None):
+        if layers is None:
+            self.keys.clear()
+            self.elements.clear()
+            self.element_keys.clear()
+            self.moving_entries.clear()
+            return
+        kept = [
+            (key, element) for key, element in zip(self.keys, self.elements)
+            if key[1] not in layers]
+        self.keys = [key for key, _ in kept]
+        self.elements = [element for _, element in kept]
+        self.element_keys = {id(element): key for key, element in kept}
+        self.moving_entries = [
+            entry for entry in self.moving_entries
+            if id(entry[0]) in self.element_keys]
+
+    def update(self):
+        """
+        Re-position the moving elements whose depth changed.
+        """
+        keys = self.keys
+        for entry in self.moving_entries:
+            element, key = entry
+            switch = element.switch
+            if switch == key[0]:
+                continue
+            index = bisect_left(keys, key)
+            new_key = (switch, key[1], key[2])
+            entry[1] = new_key
+            self.element_keys[id(element)] = new_key
+            # Small moves often keep the element between the same neighbors.
+            in_place = (
+                (index == 0 or keys[index - 1] < new_key) and
+                (index == len(keys) - 1 or new_key < keys[index + 1]))
+            if in_place:
+                keys[index] = new_key
+                continue
+            del keys[index]
+            del self.elements[index]
+            index = bisect_left(keys, new_key)
+            keys.insert(index, new_key)
+            self.elements.insert(index, element)
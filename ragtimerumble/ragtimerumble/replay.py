@@ -0,0 +1,66 @@
+import json
+
+
+REPLAY_VERSION = 1
+
+
+class ReplayJoystick:
+    """
+    Stand-in for a pygame joystick during a replay. Its state comes from the
+    recorded snapshots, never from a device.
+    """
+
+    def __init__(self, index):
+        self.index = index
+
+    def get_instance_id(self):
+        return -1 - self.index
+
+    def get_name(self):
+        return f'Replay joystick {self.index}'
+
+    def rumble(self, *_):
+        return False
+
+
+def create_round_record(scene_path, gametype, seed, joysticks):
+    """
+    A round is recorded as its seed and the joysticks snapshots of every
+    tick, run-length encoded as [[ticks count, [bitmasks]], ...].
+    """
+    return {
+        'scene': scene_path,
+        'gametype': gametype,
+        'seed': seed,
+        'joysticks': len(joysticks),
+        'inputs': []}
+
+
+def record_inputs(record, masks):
+    inputs = record['inputs']
+    masks = list(masks)
+    if inputs and inputs[-1][1] == masks:
+        inputs[-1][0] += 1
+        return
+    inputs.append([1, masks])
+
+
+def iter_inputs(record):
+    for count, masks in record['inputs']:
+        for _ in range(count):
+            yield masks
+
+
+def save_replay(filepath, rounds):
+    with open(filepath, 'w') as f:
+        json.dump({'version': REPLAY_VERSION, 'rounds': rounds}, f)
+
+
+def load_replay(filepath):
+    with open(filepath, 'r') as f:
+        replay = json.load(f)
+    if replay.get('version') != REPLAY_VERSION:
+        raise ValueError(
+            f'Unsupported replay version {replay.get("version")}, '
+            f'{REPLAY_VERSION} expected.')
+    return replay['rounds']
@@ -1,28 +1,33 @@
 import os
 import sys
 import uuid
-import json
 import random
 import itertools
 from random import shuffle
 from copy import deepcopy
 
+from ragtimerumble import profiler
 from ragtimerumble.background import Prop, Background, Overlay
 from ragtimerumble.character import Character
+from ragtimerumble.collisions import CollisionGrid, CollisionMask
 from ragtimerumble.config import GAMEROOT
 from ragtimerumble.coordinates import (
-    box_hit_box, point_in_rectangle, box_hit_polygon, path_cross_polygon,
-    path_cross_rect, Coordinates)
+    point_in_rectangle, box_hit_polygon, Coordinates)
 from ragtimerumble.config import (
     DIRECTIONS, GAMEROOT, COUNTDOWNS, CHARACTER_STATUSES,
     MAX_MESSAGES, PALLETTES_COUNT)
 from ragtimerumble.duel import find_possible_duels
+from ragtimerumble.geometry import Polyline, rect_to_polyline
+from ragtimerumble.renderlist import (
+    RenderList, CHARACTERS, PROPS, OVERLAYS, SECONDARY_NPCS,
+    INTERACTIVE_PROPS, VFX_OVERLAYS, ANIMATED_VFX)
 from ragtimerumble.io import (
     load_image, load_data, image_mirror, choice_display_name,
-    choice_kill_sentence, load_frames)
+    choice_kill_sentence, load_frames, prefetch_images,
+    release_skin_variants)
 from ragtimerumble.behavior import (
     Npc, Pianist, Barman, Ghost, Sniper, Dog, Chicken, Loop, SaloonDoor)
-from ragtimerumble.sprite import SpriteSheet, image_index_from_exposures
+from ragtimerumble.sprite import SpriteSheet, exposures_table
 
 
 BEHAVIOR_TYPES = {
@@ -35,6 +40,10 @@ BEHAVIOR_TYPES = {
     'dog': Dog,
     'loop': Loop
 }
+# Secondary npcs whose depth changes while they move.
+MOVING_BEHAVIOR_TYPES = Chicken, Dog, Ghost
+
+_gametype_data = {}
 
 
 def scene_iterator(default_scene=None, loop_on_default_scene=False):
@@ -53,12 +62,7 @@ def scene_iterator(default_scene=None, loop_on_default_scene=False):
 
 
 def load_scene(filename):
-    filepath = f'{GAMEROOT}/{filename}'
-    with open(filepath, 'r') as f:
-        data = json.load(f)
-    filepath = f'{GAMEROOT}/{filename}'
-    with open(filepath, 'r') as f:
-        data = json.load(f)
+    data = load_data(filename)
 
     scene = Scene(data)
     scene.ambiance = data['ambiance']
@@ -69,9 +73,10 @@ def load_scene(filename):
     scene.no_go_zones = data['no_go_zones']
     scene.walls = data['walls']
     scene.fences = data['fences']
+    scene.fences_polylines = [rect_to_polyline(f) for f in scene.fences]
     scene.startups = data['startups']
     scene.stairs = data['stairs']
-    scene.character_generator = itertools.cycle(data['characters'])
+    scene.bake_static_collision_mask()
 
     position = data['score']['ol']['position']
     image = load_image(data['score']['ol']['file'], key_color=(0, 255, 0))
@@ -86,12 +91,37 @@ def load_scene(filename):
     for ol in data['overlays']:
         image = load_image(ol['file'], (0, 255, 0))
         blendmode = ol['blendmode']
-        scene.overlays.append(
-            Overlay(image, ol['position'], ol['y'], blendmode))
+        overlay = Overlay(image, ol['position'], ol['y'], blendmode)
+        scene.overlays.append(overlay)
+        scene.render_list.add(overlay, OVERLAYS)
 
     return scene
 
 
+def prefetch_scene(filename):
+    """
+    Decode in background the images a scene loads and populates with.
+    """
+    data = load_data(filename)
+    score = data['score']
+    filenames = [score['ol']['file']]
+    filenames.extend(background['file'] for background in data['backgrounds'])
+    filenames.extend(overlay['file'] for overlay in data['overlays'])
+    for i in range(1, 5):
+        player = score[f'player{i}']
+        filenames.extend(player['life'][f'file{j}'] for j in range(1, 5))
+        filenames.extend((player['bullet']['on'], player['bullet']['off']))
+    filenames.extend(prop['file'] for prop in data['props'])
+    filenames.extend(prop['image'] for prop in data['interactive_props'])
+    filenames.extend(load_data(npc['file'])['filepath'] for npc in data['npcs'])
+    for vfx in data['vfx']:
+        if vfx.get('type') == 'static':
+            filenames.append(vfx['file'])
+        elif vfx.get('type') == 'animated':
+            filenames.append(load_data(vfx['file'])['sheet'])
+    return prefetch_images(filenames)
+
+
 def depopulate_scene(scene, clear_players=True):
     if clear_players:
         scene.players.clear()
@@ -107,6 +137,7 @@ def depopulate_scene(scene, clear_players=True):
     scene.shadow_zones.clear()
     scene.interaction_zones.clear()
     scene.props.clear()
+    scene.interactive_props.clear()
     scene.possible_duels.clear()
     scene.characters.clear()
     scene.sniperreticles.clear()
@@ -116,12 +147,30 @@ def depopulate_scene(scene, clear_players=True):
     scene.messenger.clear()
     scene.vfx_overlays.clear()
     scene.npcs.clear()
-
-
-def populate_scene(filename, scene, gametype):
-    filepath = f'{GAMEROOT}/{filename}'
-    with open(filepath, 'r') as f:
-        data = json.load(f)
+    scene.static_layer = None
+    scene.render_list.clear((
+        CHARACTERS, PROPS, SECONDARY_NPCS, INTERACTIVE_PROPS, VFX_OVERLAYS,
+        ANIMATED_VFX))
+    scene.index_colliders()
+    # Only the players skins survive to the next round.
+    release_skin_variants(
+        (player.character.spritesheet.data, player.character.palette)
+        for player in scene.players)
+
+
+def populate_scene(filename, scene, gametype, seed=None):
+    """
+    The scene random generator is seeded here: a round is reproducible from
+    its seed and the players inputs.
+    """
+    data = load_data(filename)
+    gametype_data = get_gametype_data(filename, gametype)
+    scene.random.seed(seed)
+    scene.display_names.clear()
+    characters = data['characters']
+    start = scene.random.randrange(len(characters))
+    scene.character_generator = itertools.cycle(
+        characters[start:] + characters[:start])
 
     for i in range(1, 5):
         player_key = f'player{i}'
@@ -136,25 +185,21 @@ def populate_scene(filename, scene, gametype):
         off = load_image(data['score'][player_key]['bullet']['off'])
         scene.bullet_images.append([on, off])
 
-    for npc in data['npcs']:
-        if gametype not in npc['gametypes']:
-            continue
-        scene.secondary_npcs.append(BEHAVIOR_TYPES[npc['type']](scene=scene, **npc))
+    for npc in gametype_data['npcs']:
+        # Behaviors keep their arguments, they get their own copy.
+        npc = deepcopy(npc)
+        npc = BEHAVIOR_TYPES[npc['type']](scene=scene, **npc)
+        scene.secondary_npcs.append(npc)
+        moving = isinstance(npc, MOVING_BEHAVIOR_TYPES)
+        scene.render_list.add(npc, SECONDARY_NPCS, moving=moving)
 
-    for interaction_zone in data['interactions']:
-        if gametype not in interaction_zone['gametypes']:
-            continue
+    for interaction_zone in gametype_data['interactions']:
         zone = InteractionZone(interaction_zone)
         scene.interaction_zones.append(zone)
 
-    for zone in data['shadow_zones']:
-        if gametype not in zone['gametypes']:
-            continue
-        scene.shadow_zones.append(zone)
+    scene.shadow_zones.extend(gametype_data['shadow_zones'])
 
-    for prop in data['props']:
-        if gametype not in prop['gametypes']:
-            continue
+    for prop in gametype_data['props']:
         prop = Prop(
             image=load_image(prop['file']),
             position=prop['position'],
@@ -164,23 +209,51 @@ def populate_scene(filename, scene, gametype):
             visible_at_dispatch=prop['visible_at_dispatch'],
             scene=scene)
         scene.props.append(prop)
+        scene.render_list.add(prop, PROPS)
 
-    popspots = [
-        p['position'] for p in data['popspots'] if gametype in p['gametypes']]
-    random.shuffle(popspots)
+    popspots = list(gametype_data['popspots'])
+    scene.random.shuffle(popspots)
     scene.popspot_generator = itertools.cycle(popspots)
 
-    scene.targets = [t for t in data['targets'] if gametype in t['gametypes']]
-    scene.smooth_paths = [
-        p['points'] for p in data['paths'] if
-        not p['hard'] and gametype in p['gametypes']]
-    scene.hard_paths = [
-        p['points'] for p in data['paths'] if
-        p['hard'] and gametype in p['gametypes']]
+    scene.targets = list(gametype_data['targets'])
+    scene.smooth_paths = list(gametype_data['smooth_paths'])
+    scene.hard_paths = list(gametype_data['hard_paths'])
 
+    scene.index_colliders(gametype)
+    scene.static_layer = None
     return scene
 
 
+def get_gametype_data(filename, gametype):
+    """
+    Scene elements available for a gametype, filtered once per process.
+    """
+    key = filename, gametype
+    if key in _gametype_data:
+        return _gametype_data[key]
+    data = load_data(filename)
+
+    def filtered(elements):
+        return [e for e in elements if gametype in e['gametypes']]
+
+    gametype_data = {
+        'npcs': filtered(data['npcs']),
+        'interactions': filtered(data['interactions']),
+        'shadow_zones': [
+            dict(zone, polyline=Polyline(zone['polygon']))
+            for zone in filtered(data['shadow_zones'])],
+        'props': filtered(data['props']),
+        'popspots': [p['position'] for p in filtered(data['popspots'])],
+        'targets': filtered(data['targets']),
+        'smooth_paths': [
+            p['points'] for p in filtered(data['paths']) if not p['hard']],
+        'hard_paths': [
+            p['points'] for p in filtered(data['paths']) if p['hard']],
+    }
+    _gametype_data[key] = gametype_data
+    return gametype_data
+
+
 def find_prop(data, name):
     for prop in data['interactive_props']:
         if name == prop['name']:
@@ -204,6 +277,7 @@ class Scene:
         self.backgrounds = []
         self.characters = []
         self.fences = []
+        self.fences_polylines = []
         self.hard_paths = []
         self.interaction_zones = []
         self.interactive_props = []
@@ -229,23 +303,37 @@ class Scene:
         self.killer = None
         self.popspot_generator = None
         self.character_generator = None
+        self.display_names = {}
+        # Every random draw of the simulation goes through this generator.
+        self.random = random.Random()
+        self.collision_grid = CollisionGrid()
+        self.static_collision_mask = CollisionMask()
+        self.collision_masks = {}
+        self.collision_mask = self.static_collision_mask
         self.messenger = Messenger()
+        self.render_list = RenderList()
+        # Pre-composited by the renderer, reset when the static set changes.
+        self.static_layer = None
 
     def coins_position(self, index):
         return self.data['score'][f'player{index + 1}']['coins_position']
 
     def create_vfx(self, name, position, flipped=True):
+        self.static_layer = None
         for vfx in self.vfx:
             if vfx.get('type') == 'static' and vfx.get('name') == name:
                 image = load_image(vfx['file'])
                 if flipped:
                     image = image_mirror(image, horizontal=True)
-                self.vfx_overlays.append(
-                    Overlay(image, position, vfx['y'], vfx['blendmode']))
+                overlay = Overlay(image, position, vfx['y'], vfx['blendmode'])
+                self.vfx_overlays.append(overlay)
+                self.render_list.add(overlay, VFX_OVERLAYS)
                 return
             if vfx.get('type') == 'animated' and vfx.get('name') == name:
                 data = load_data(vfx['file'])
-                self.animated_vfx.append(Vfx(data, position))
+                animated_vfx = Vfx(data, position)
+                self.animated_vfx.append(animated_vfx)
+                self.render_list.add(animated_vfx, ANIMATED_VFX)
                 return
 
     @property
@@ -261,20 +349,21 @@ class Scene:
 
     @property
     def this_is_a_tie(self):
-        return all(p.dead for p in self.players)
+        return bool(self.players) and all(p.dead for p in self.players)
 
     def build_character(self, group=None, direction=None, popspot=None):
         if group and popspot:
             position = group['popspots'][popspot]
         else:
             position = next(self.popspot_generator)
-            direction = direction or random.choice(DIRECTIONS.ALL)
+            direction = direction or self.random.choice(DIRECTIONS.ALL)
 
         char = next(self.character_generator)
         data = load_data(char)
-        spritesheet = SpriteSheet(data)
-        palette = random.choice(list(range(PALLETTES_COUNT)))
-        display_name = choice_display_name(data)
+        spritesheet = SpriteSheet(char, rng=self.random)
+        palette = self.random.choice(list(range(PALLETTES_COUNT)))
+        display_name = choice_display_name(
+            data, self.random, self.display_names)
         char = Character(position, spritesheet, palette, display_name, self)
 
         if group:
@@ -283,6 +372,7 @@ class Scene:
 
         char.direction = direction
         self.characters.append(char)
+        self.render_list.add(char, CHARACTERS, moving=True)
         return char
 
     def get_interaction(self, interaction_id):
@@ -304,10 +394,11 @@ class Scene:
 
     @property
     def elements(self):
-        return (
-            self.characters + self.props + self.overlays +
-            self.secondary_npcs + self.interactive_props +
-            self.vfx_overlays + self.animated_vfx)
+        """
+        Scene elements sorted by depth, ready to be rendered.
+        """
+        self.render_list.update()
+        return self.render_list
 
     def inclination_at(self, point):
         return next((
@@ -329,41 +420,80 @@ class Scene:
             for _ in range(t['weight'])
             for d in t['destinations']]
 
-        destination = random.choice(destinations)
-        x = random.randrange(destination[0], destination[0] + destination[2])
-        y = random.randrange(destination[1], destination[1] + destination[3])
+        destination = self.random.choice(destinations)
+        x = self.random.randrange(
+            destination[0], destination[0] + destination[2])
+        y = self.random.randrange(
+            destination[1], destination[1] + destination[3])
 
         return x, y
 
+    def bake_static_collision_mask(self):
+        self.static_collision_mask = CollisionMask()
+        for zone in self.no_go_zones:
+            self.static_collision_mask.add_rect(zone)
+        for wall in self.walls:
+            self.static_collision_mask.add_polygon(wall)
+        self.collision_masks.clear()
+        self.collision_mask = self.static_collision_mask
+
+    def index_colliders(self, gametype=None):
+        """
+        Static colliders only change when the scene is (de)populated. Bucket
+        them once in a grid to avoid scanning the whole scene at every
+        collision test and rasterize them in a walkability mask. Props only
+        depend on the gametype, so the masks are cached per gametype.
+        """
+        self.collision_grid.clear()
+        for prop in self.props:
+            if prop.screen_box:
+                self.collision_grid.add_rect(prop.screen_box)
+        for zone in self.no_go_zones:
+            self.collision_grid.add_rect(zone)
+        for wall in self.walls:
+            self.collision_grid.add_polygon(wall)
+
+        if gametype is None:
+            self.collision_mask = self.static_collision_mask
+            return
+        if gametype not in self.collision_masks:
+            mask = self.static_collision_mask.copy()
+            for prop in self.props:
+                if prop.screen_box:
+                    mask.add_rect(prop.screen_box)
+            self.collision_masks[gametype] = mask
+        self.collision_mask = self.collision_masks[gametype]
+
     def cross(self, path):
-        for element in self.elements:
-            if not isinstance(element, Prop) or not element.screen_box:
-                continue
-            if path_cross_rect(path, element.screen_box):
-                return True
-        if any(path_cross_rect(zone, path) for zone in self.no_go_zones):
-            return True
-        return any(path_cross_polygon(path, wall) for wall in self.walls)
+        return self.collision_grid.cross(path)
 
     def instersected_shadow_zone(self, box):
         for shadow_zone in self.shadow_zones:
-            if box_hit_polygon(box, shadow_zone['polygon']):
+            if box_hit_polygon(box, shadow_zone['polyline']):
                 return shadow_zone
 
     def collide(self, box):
-        for element in self.elements:
-            if not isinstance(element, Prop) or not element.screen_box:
-                continue
-            if box_hit_box(box, element.screen_box):
-                return True
-        if any(box_hit_box(zone, box) for zone in self.no_go_zones):
-            return True
-        return any(box_hit_polygon(box, wall) for wall in self.walls)
+        collide = self.collision_mask.collide(box)
+        if collide is None:  # Out of the rasterized area.
+            return self.collision_grid.collide(box)
+        return collide
 
     def __next__(self):
-        next(self.messenger)
-        for evaluable in self.npcs + self.players + self.secondary_npcs:
-            next(evaluable)
+        # Evaluables added during the tick are evaluated from the next one.
+        npcs = list(self.npcs)
+        players = list(self.players)
+        secondary_npcs = list(self.secondary_npcs)
+        with profiler.scope('scene.messenger'):
+            next(self.messenger)
+        with profiler.scope('scene.npcs'):
+            for npc in npcs:
+                next(npc)
+        with profiler.scope('scene.players'):
+            for player in players:
+                next(player)
+        with profiler.scope('scene.secondary_npcs'):
+            for npc in secondary_npcs:
+                next(npc)
 
         if self.black_screen_countdown or self.white_screen_countdown:
             if self.white_screen_countdown:
@@ -372,17 +502,20 @@ class Scene:
                 self.black_screen_countdown -= 1
             self.possible_duels = []
             return
-        self.possible_duels = find_possible_duels(self)
-        to_delete = []
-        for vfx in self.animated_vfx:
-            if vfx.type == 'static':
-                continue
-            if vfx.animation_is_done:
-                to_delete.append(vfx)
-                continue
-            next(vfx)
-        for vfx in to_delete:
-            self.animated_vfx.remove(vfx)
+        with profiler.scope('scene.duels'):
+            self.possible_duels = find_possible_duels(self)
+        with profiler.scope('scene.vfx'):
+            to_delete = []
+            for vfx in self.animated_vfx:
+                if vfx.type == 'static':
+                    continue
+                if vfx.animation_is_done:
+                    to_delete.append(vfx)
+                    continue
+                next(vfx)
+            for vfx in to_delete:
+                self.animated_vfx.remove(vfx)
+                self.render_list.remove(vfx)
 
     @property
     def snipers(self):
@@ -411,6 +544,8 @@ class Scene:
         prop = find_prop(self.data, name)
         zone = create_interactive_prop(prop, position)
         self.interactive_props.append(zone)
+        self.render_list.add(zone, INTERACTIVE_PROPS)
+        self.static_layer = None
 
     def apply_black_screen(self, origin, target):
         self.white_screen_countdown = COUNTDOWNS.WHITE_SCREEN
@@ -442,7 +577,8 @@ class Scene:
                 break
         else:
             return
-        del self.interactive_props[i]
+        self.render_list.remove(self.interactive_props.pop(i))
+        self.static_layer = None
 
 
 def apply_zone_to_character(zone, character):
@@ -545,6 +681,7 @@ class Vfx:
         self.images = load_frames(data['sheet'], data['framesize'], None)
         self.coordinates = Coordinates(position)
         self.exposures = data['exposures']
+        self.frames = exposures_table(self.exposures)
         self.switch = 2000
 
     @property
@@ -558,9 +695,10 @@ class Vfx:
 
     @property
     def image(self):
-        index = image_index_from_exposures(self.index, self.exposures)
+        index = self.index
+        index = self.frames[index] if 0 <= index < len(self.frames) else 0
         return self.images[index]
 
     @property
     def animation_is_done(self):
-        return self.index >= sum(self.exposures) - 1
+        return self.index >= len(self.frames) - 1
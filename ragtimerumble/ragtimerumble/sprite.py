@@ -1,41 +1,44 @@
 import random
-from ragtimerumble.config import DIRECTION_TO_SIDE, DIRECTIONS
-from ragtimerumble.io import load_skin, image_mirror
+import itertools
+from ragtimerumble.config import ANIMATION_SIDES, DIRECTION_TO_SIDE, DIRECTIONS
+from ragtimerumble.io import load_data, load_skin, image_mirror
+
+
+_animation_tables = {}
+_exposures_tables = {}
 
 
 class SpriteSheet:
-    def __init__(self, data, start_animation='idle'):
-        self.data = data
+    def __init__(self, filename, start_animation='idle', rng=random):
+        self.data = load_data(filename)
+        self.tables = compile_animations(filename)
         self.animation = start_animation
-        self.index = random.randrange(0, self.animation_length() - 1)
-        self.images = load_skin(data)
+        self.index = rng.randrange(0, self.animation_length() - 1)
 
     @property
     def exposures(self):
         return self.data['animations'][self.animation]['exposures']
 
     def math_animation(self, direction):
-        side = DIRECTION_TO_SIDE[direction]
-        possible_match = f'{self.animation}-{side}'
-        if possible_match in self.data['animations']:
-            return possible_match
-        return self.animation
+        return match_side_animation(
+            self.data['animations'], self.animation,
+            DIRECTION_TO_SIDE[direction])
 
     def image(self, direction=DIRECTIONS.RIGHT, palette=0):
-        index = image_index_from_exposures(self.index, self.exposures)
-        animation = self.math_animation(direction)
-        index += self.data['animations'][animation]['startframe']
-        self.images[palette]
-        image = self.images[palette][index]
+        side = DIRECTION_TO_SIDE[direction]
+        startframe, frames = self.tables[self.animation, side]
+        index = self.index
+        index = frames[index] if 0 <= index < len(frames) else 0
+        image = load_skin(self.data, palette)[startframe + index]
         flipped = direction in DIRECTIONS.FLIPPED
         return image_mirror(image, horizontal=True) if flipped else image
 
     def animation_length(self):
-        return sum(self.exposures)
+        return len(self.tables[self.animation, ANIMATION_SIDES.FACE][1])
 
     @property
     def animation_is_done(self):
-        return self.index >= sum(self.exposures) - 1
+        return self.index >= self.animation_length() - 1
 
     def restart(self):
         self.index = 0
@@ -45,20 +48,46 @@ class SpriteSheet:
             self.index += 1
 
 
-def image_index_from_exposures(index, exposures):
-    """Data indexes:
-    0       1   2           3           4
-    Animation indexes:
-    0 - 1 - 2 - 3 - 4 - 5 - 6 - 7 - 8 - 9
-    Return examples:
-        index = 1 -> 2
-        index = 3 -> 6
-        index = 8 -> 3
+def match_side_animation(animations, animation, side):
+    possible_match = f'{animation}-{side}'
+    if possible_match in animations:
+        return possible_match
+    return animation
+
+
+def compile_animations(filename):
     """
-    loop = 0
-    for i, d in enumerate(exposures):
-        for _ in range(d):
-            if index == loop:
-                return i
-            loop += 1
-    return 0
+    Compile once per animdata file the animations as
+    {(animation, side): (startframe, tick to frame table)}.
+    The table comes from the animation exposures and the startframe from its
+    side variant (e.g. walk-back) when the sheet has one. The tables are
+    compiled again if the file data was reloaded.
+    """
+    data = load_data(filename)
+    compiled = _animation_tables.get(filename)
+    if compiled and compiled[0] is data:
+        return compiled[1]
+    tables = {}
+    animations = data['animations']
+    for animation, side in itertools.product(
+            animations, (ANIMATION_SIDES.FACE, ANIMATION_SIDES.BACK)):
+        frames = exposures_table(animations[animation]['exposures'])
+        match = match_side_animation(animations, animation, side)
+        tables[animation, side] = animations[match]['startframe'], frames
+    _animation_tables[filename] = data, tables
+    return tables
+
+
+def exposures_table(exposures):
+    """
+    Tick to frame table: exposures [2, 1, 3] gives (0, 0, 1, 2, 2, 2).
+    """
+    key = tuple(exposures)
+    table = _exposures_tables.get(key)
+    if table is None:
+        table = tuple(
+            i for i, exposure in enumerate(exposures)
+            for _ in range(exposure))
+        _exposures_tables[key] = table
+    return table
+
@@ -0,0 +1,82 @@
+import json
+import numpy as np
+from ragtimerumble.config import (
+    CHARACTER_STATUSES, TELEMETRY_CHUNK_SIZE, TELEMETRY_HEADER_SIZE)
+
+
+TELEMETRY_FORMAT = 'ragtimerumble-telemetry'
+TELEMETRY_VERSION = 1
+TELEMETRY_DTYPE = np.dtype([
+    ('tick', '<u4'),
+    ('character', '<u2'),
+    ('x', '<f4'),
+    ('y', '<f4'),
+    ('status', 'u1'),
+    ('pilot', '?')])
+TELEMETRY_STATUSES = (
+    CHARACTER_STATUSES.AUTOPILOT,
+    CHARACTER_STATUSES.DUEL_ORIGIN,
+    CHARACTER_STATUSES.DUEL_TARGET,
+    CHARACTER_STATUSES.INTERACTING,
+    CHARACTER_STATUSES.OUT,
+    CHARACTER_STATUSES.FREE,
+    CHARACTER_STATUSES.STUCK)
+STATUS_CODES = {status: i for i, status in enumerate(TELEMETRY_STATUSES)}
+
+
+def build_header():
+    """
+    The header is a json line padded to TELEMETRY_HEADER_SIZE, the records
+    follow as raw TELEMETRY_DTYPE structs. A file cut by a crash stays
+    readable up to its last complete record.
+    """
+    header = {
+        'format': TELEMETRY_FORMAT,
+        'version': TELEMETRY_VERSION,
+        'dtype': TELEMETRY_DTYPE.descr,
+        'statuses': TELEMETRY_STATUSES}
+    header = json.dumps(header).encode() + b'\n'
+    if len(header) > TELEMETRY_HEADER_SIZE:
+        raise ValueError(f'Telemetry header too long: {len(header)} bytes')
+    return header.ljust(TELEMETRY_HEADER_SIZE, b' ')
+
+
+class TelemetryWriter:
+    """
+    Write the characters states while the game runs. The records are
+    gathered in a fixed size chunk which is appended to the file once full:
+    the memory used doesn't grow with the session length.
+    """
+
+    def __init__(self, filepath, chunk_size=TELEMETRY_CHUNK_SIZE):
+        self.file = open(filepath, 'wb')
+        self.file.write(build_header())
+        self.chunk = np.zeros(chunk_size, dtype=TELEMETRY_DTYPE)
+        self.size = 0
+
+    def record(self, tick, characters, filter_=None):
+        """
+        Record the characters of a tick, identified by their index in the
+        list given.
+        """
+        for index, character in enumerate(characters):
+            if filter_ and not filter_(character):
+                continue
+            x, y = character.coordinates.position
+            self.chunk[self.size] = (
+                tick, index, x, y, STATUS_CODES[character.status],
+                character.pilot is not None)
+            self.size += 1
+            if self.size == len(self.chunk):
+                self.flush()
+
+    def flush(self):
+        self.file.write(self.chunk[:self.size].tobytes())
+        self.file.flush()
+        self.size = 0
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
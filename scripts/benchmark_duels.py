@@ -0,0 +1,111 @@
+"""
+Compare duel.find_possible_duels with the original O(n²) implementation:
+check both give the exact same duels and time them for several crowd sizes.
+"""
+import os
+import sys
+import time
+import json
+import random
+
+sys.path.append(f'{os.path.dirname(__file__)}/../ragtimerumble')
+from ragtimerumble.config import CHARACTER_STATUSES, DIRECTIONS, DUEL
+from ragtimerumble.coordinates import Coordinates, path_cross_rect
+from ragtimerumble.duel import find_possible_duels
+from ragtimerumble.geometry import rect_to_polyline
+
+
+CHARACTER_COUNTS = 35, 100, 300
+FRAMES = 50
+SCENE = f'{os.path.dirname(__file__)}/../ragtimerumble/resources/scenes/saloon.json'
+STATUSES = (
+    CHARACTER_STATUSES.DUELABLES * 3 + [
+        CHARACTER_STATUSES.OUT,
+        CHARACTER_STATUSES.INTERACTING])
+
+
+def reference_find_possible_duels(scene):
+    characters = scene.characters
+    possible_duels = []
+    for char1 in characters:
+        if char1.status not in CHARACTER_STATUSES.DUELABLES:
+            continue
+        duel = None
+        duel_distance = None
+
+        for char2 in characters:
+            if char2.status not in CHARACTER_STATUSES.DUELABLES:
+                continue
+            if char1 == char2:
+                continue
+
+            height = char1.coordinates.y - char2.coordinates.y
+            if abs(height) > DUEL.TOLERENCE:
+                continue
+
+            x1 = char1.coordinates.x
+            x2 = char2.coordinates.x
+            path = char1.coordinates.position, char2.coordinates.position
+            conditions = (
+                char1.direction in DIRECTIONS.RIGHTS and (x1 - x2) > 0 or
+                char1.direction in DIRECTIONS.LEFTS and (x2 - x1) > 0 or
+                not (DUEL.RANGE[0] <= abs(x1 - x2) <= DUEL.RANGE[1]) or
+                any(path_cross_rect(path, fence) for fence in scene.fences))
+
+            if conditions:
+                continue
+
+            dist = char1.coordinates.distance_to(char2.coordinates)
+            if duel_distance and dist > duel_distance:
+                continue
+            duel = (char1, char2)
+            duel_distance = dist
+
+        if duel is not None:
+            possible_duels.append(duel)
+
+    return possible_duels
+
+
+class FakeCharacter:
+    def __init__(self, rng):
+        # Integer positions on half of the characters to provoke ties.
+        if rng.random() < .5:
+            position = rng.randrange(0, 640), rng.randrange(0, 360)
+        else:
+            position = rng.uniform(0, 640), rng.uniform(0, 360)
+        self.coordinates = Coordinates(position)
+        self.status = rng.choice(STATUSES)
+        self.direction = rng.choice(DIRECTIONS.ALL)
+
+
+class FakeScene:
+    def __init__(self, fences, count, rng):
+        self.fences = fences
+        self.fences_polylines = [rect_to_polyline(f) for f in fences]
+        self.characters = [FakeCharacter(rng) for _ in range(count)]
+
+
+def benchmark(function, scenes):
+    start = time.perf_counter()
+    for scene in scenes:
+        function(scene)
+    return (time.perf_counter() - start) / len(scenes) * 1000
+
+
+if __name__ == '__main__':
+    with open(SCENE, 'r') as f:
+        fences = json.load(f)['fences']
+    rng = random.Random(0)
+    for count in CHARACTER_COUNTS:
+        scenes = [FakeScene(fences, count, rng) for _ in range(FRAMES)]
+        for scene in scenes:
+            expected = reference_find_possible_duels(scene)
+            if find_possible_duels(scene) != expected:
+                print(f'MISMATCH with {count} characters')
+                sys.exit(1)
+        before = benchmark(reference_find_possible_duels, scenes)
+        after = benchmark(find_possible_duels, scenes)
+        print(
+            f'{count} characters: {before:.2f}ms -> {after:.2f}ms '
+            f'(x{before / after:.1f})')
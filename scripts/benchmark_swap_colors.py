@@ -0,0 +1,100 @@
+"""
+Compare the skin palette variants built by the game (8 bits sheet and
+palette.swap_color_table, as io.load_skin_variant does) with the original
+per-color swap of the 32 bits sheet on the real skins: check both give the
+exact same pixels and time them per sheet.
+"""
+import os
+import sys
+import json
+import time
+import random
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+import pygame
+
+sys.path.append(f'{os.path.dirname(__file__)}/../ragtimerumble')
+from ragtimerumble.config import GAMEROOT
+from ragtimerumble.io import (
+    build_palette, load_indexed_sheet, random_palette_indexes)
+from ragtimerumble.palette import swap_color_table
+
+
+PALETTES_PER_SKIN = 5
+ANIMDATA_DIRECTORY = f'{GAMEROOT}/resources/animdata'
+
+
+def reference_swap_colors(sheet, palette1, palette2):
+    surface = sheet.copy()
+    arr = pygame.surfarray.pixels3d(surface)
+    red, green, blue = arr.T
+    for color1, color2 in zip(palette1, palette2):
+        if color1 == color2:
+            continue
+        areas = (red == color1[0]) & (blue == color1[2]) & (green == color1[1])
+        arr[..., ][areas.T] = color2
+    new_surface = pygame.surfarray.make_surface(arr).convert_alpha()
+    alpha_array = pygame.surfarray.pixels_alpha(surface)
+    pygame.surfarray.pixels_alpha(new_surface)[:] = alpha_array[:]
+    return new_surface
+
+
+def indexed_swap_colors(sheet, palette1, palette2):
+    indexed, colors = sheet
+    indexed.set_palette(swap_color_table(colors, palette1, palette2))
+    return indexed.convert_alpha()
+
+
+def benchmark(function, sheet, palette1, palette2):
+    start = time.perf_counter()
+    result = function(sheet, palette1, palette2)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def visible_pixels(surface):
+    """
+    Transparent pixels color differ between the two paths, only compare the
+    opaque ones.
+    """
+    pixels = pygame.surfarray.array3d(surface)
+    alpha = pygame.surfarray.array_alpha(surface)
+    pixels[alpha == 0] = 0
+    return pixels.tobytes() + alpha.tobytes()
+
+
+if __name__ == '__main__':
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    random.seed(0)
+    before_total, after_total = 0, 0
+    for filename in sorted(os.listdir(ANIMDATA_DIRECTORY)):
+        with open(f'{ANIMDATA_DIRECTORY}/{filename}', 'r') as f:
+            data = json.load(f)
+        if not data.get('palettes'):
+            continue
+        filepath = f'{GAMEROOT}/{data["filepath"]}'
+        sheet = pygame.image.load(filepath).convert_alpha()
+        indexed = load_indexed_sheet(filepath)
+        before_sheet, after_sheet = 0, 0
+        for _ in range(PALETTES_PER_SKIN):
+            indexes = random_palette_indexes(data['palettes'])
+            _, palette1, palette2 = build_palette(data['palettes'], indexes)
+            expected, before = benchmark(
+                reference_swap_colors, sheet, palette1, palette2)
+            result, after = benchmark(
+                indexed_swap_colors, indexed, palette1, palette2)
+            if visible_pixels(result) != visible_pixels(expected):
+                print(f'MISMATCH on {filename} with palette {indexes}')
+                sys.exit(1)
+            before_sheet += before
+            after_sheet += after
+        before_sheet /= PALETTES_PER_SKIN
+        after_sheet /= PALETTES_PER_SKIN
+        before_total += before_sheet
+        after_total += after_sheet
+        print(
+            f'{filename} {sheet.get_size()}: {before_sheet:.1f}ms -> '
+            f'{after_sheet:.1f}ms (x{before_sheet / after_sheet:.1f})')
+    print(
+        f'all sheets: {before_total:.1f}ms -> {after_total:.1f}ms '
+        f'(x{before_total / after_total:.1f})')
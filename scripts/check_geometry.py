@@ -0,0 +1,135 @@
+"""
+Differential check of ragtimerumble.coordinates intersection functions
+against the matplotlib.path implementation they replaced.
+matplotlib is only needed to run this script, not by the game.
+"""
+import os
+import sys
+import json
+import random
+from matplotlib.path import Path
+
+sys.path.append(f'{os.path.dirname(__file__)}/../ragtimerumble')
+from ragtimerumble.coordinates import (
+    box_hit_polygon, path_cross_polygon, path_cross_rect)
+from ragtimerumble.geometry import Polyline, rect_to_polyline
+
+
+ITERATIONS = 20000
+SCENES_DIRECTORY = f'{os.path.dirname(__file__)}/../ragtimerumble/resources/scenes'
+
+
+def rect_points(rect):
+    tl = [rect[0], rect[1]]
+    tr = [rect[0] + rect[2], rect[1]]
+    bl = [rect[0], rect[1] + rect[3]]
+    br = [rect[0] + rect[2], rect[1] + rect[3]]
+    return [tl, tr, bl, br]
+
+
+def reference_box_hit_polygon(rect, polygon):
+    return Path(rect_points(rect)).intersects_path(Path(polygon), filled=True)
+
+
+def reference_path_cross_polygon(path, polygon):
+    return Path(path).intersects_path(Path(polygon))
+
+
+def reference_path_cross_rect(path, rect):
+    return Path(path).intersects_path(Path(rect_points(rect)))
+
+
+def random_coordinate(rng, integer):
+    # Integers on a small grid produce many touching/collinear cases.
+    if integer:
+        return rng.randrange(0, 40, 5)
+    return rng.uniform(0, 40)
+
+
+def random_rect(rng, integer):
+    return [
+        random_coordinate(rng, integer),
+        random_coordinate(rng, integer),
+        random_coordinate(rng, integer) / 2,
+        random_coordinate(rng, integer) / 2]
+
+
+def random_points(rng, integer, count):
+    return [
+        [random_coordinate(rng, integer), random_coordinate(rng, integer)]
+        for _ in range(count)]
+
+
+def scenes_shapes():
+    walls, fences, shadows = [], [], []
+    for filename in os.listdir(SCENES_DIRECTORY):
+        with open(f'{SCENES_DIRECTORY}/{filename}', 'r') as f:
+            data = json.load(f)
+        walls.extend(data['walls'])
+        fences.extend(data['fences'])
+        shadows.extend(z['polygon'] for z in data.get('shadow_zones', []))
+    return walls, fences, shadows
+
+
+def check(name, result, expected, *args):
+    if result == expected:
+        return 0
+    print(f'MISMATCH {name}{args}: got {result}, expected {expected}')
+    return 1
+
+
+def run(seed=0):
+    rng = random.Random(seed)
+    errors = 0
+    for i in range(ITERATIONS):
+        integer = i % 2 == 0
+        rect = random_rect(rng, integer)
+        polygon = random_points(rng, integer, rng.randint(2, 7))
+        path = random_points(rng, integer, rng.randint(2, 4))
+        errors += check(
+            'box_hit_polygon',
+            box_hit_polygon(rect, polygon),
+            reference_box_hit_polygon(rect, polygon),
+            rect, polygon)
+        errors += check(
+            'path_cross_polygon',
+            path_cross_polygon(path, polygon),
+            reference_path_cross_polygon(path, polygon),
+            path, polygon)
+        errors += check(
+            'path_cross_rect',
+            path_cross_rect(path, rect),
+            reference_path_cross_rect(path, rect),
+            path, rect)
+
+    # Real scene data with pre-compiled shapes, as used by the game.
+    walls, fences, shadows = scenes_shapes()
+    for polygon in walls + shadows:
+        polyline = Polyline(polygon)
+        for _ in range(ITERATIONS // 10):
+            x, y = rng.randrange(-10, 650), rng.randrange(-10, 370)
+            rect = [x, y, rng.randrange(1, 30), rng.randrange(1, 20)]
+            errors += check(
+                'box_hit_polygon',
+                box_hit_polygon(rect, polyline),
+                reference_box_hit_polygon(rect, polygon),
+                rect, polygon)
+    for fence in fences:
+        polyline = rect_to_polyline(fence)
+        for _ in range(ITERATIONS // 10):
+            y = rng.randrange(0, 360)
+            path = [
+                [rng.randrange(0, 640), y],
+                [rng.randrange(0, 640), y + rng.randrange(-15, 16)]]
+            errors += check(
+                'path_cross_rect',
+                path_cross_polygon(path, polyline),
+                reference_path_cross_rect(path, fence),
+                path, fence)
+    return errors
+
+
+if __name__ == '__main__':
+    errors = run()
+    print('geometry check:', 'OK' if not errors else f'{errors} mismatch(es)')
+    sys.exit(1 if errors else 0)
@@ -0,0 +1,46 @@
+"""
+Record the inputs of a headless run with its telemetry, replay them with
+telemetry too and check both telemetries are byte identical (same ticks,
+same characters states).
+"""
+import os
+import sys
+import tempfile
+import subprocess
+
+
+TICKS = 1000
+SEED = 7
+GAMEROOT = f'{os.path.dirname(__file__)}/../ragtimerumble'
+SCENE = 'resources/scenes/saloon.json'
+
+
+def run_game(*arguments):
+    command = [
+        sys.executable, 'ragtimerumble', '-nr', '-ds', SCENE, *arguments]
+    result = subprocess.run(
+        command, cwd=GAMEROOT, capture_output=True, text=True)
+    if result.returncode:
+        print(result.stderr)
+        sys.exit(result.returncode)
+    return result.stdout.splitlines()[-2]
+
+
+if __name__ == '__main__':
+    directory = tempfile.mkdtemp()
+    inputs = f'{directory}/inputs.json'
+    recorded = f'{directory}/recorded.tel'
+    replayed = f'{directory}/replayed.tel'
+    print('record:', run_game(
+        '-hl', str(TICKS), '-sd', str(SEED), '-ri', inputs, '-r', recorded))
+    print('replay:', run_game('-pi', inputs, '-r', replayed))
+    with open(recorded, 'rb') as f:
+        recorded_data = f.read()
+    with open(replayed, 'rb') as f:
+        replayed_data = f.read()
+    if recorded_data != replayed_data:
+        print(
+            f'MISMATCH: {len(recorded_data)} bytes recorded, '
+            f'{len(replayed_data)} bytes replayed')
+        sys.exit(1)
+    print(f'telemetries identical ({len(recorded_data)} bytes)')
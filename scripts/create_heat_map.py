@@ -1,26 +1,37 @@
+"""
+Render a telemetry file as a heat map png. The telemetry defaults to the
+npcs coordinates logged by debug.log_npc_coordinates.
+"""
 import os
-import json
-from PySide2 import QtWidgets, QtCore, QtGui
+import sys
+import argparse
+from PIL import Image
 
-app = QtGui.QGuiApplication()
-image = QtGui.QPixmap(QtCore.QSize(640, 360))
-painter = QtGui.QPainter(image)
+sys.path.append(f'{os.path.dirname(__file__)}/../sdk')
+from pixaloon.telemetry import Telemetry, build_heatmap, HEATMAP_BLUR_RADIUS
 
-filepath = f'{os.path.dirname(__file__)}/../refs/coord.json'
-with open(filepath, 'r') as f:
-    points = json.load(f)
 
-image.fill(QtCore.Qt.white)
+REFS = f'{os.path.dirname(__file__)}/../refs'
 
-color = QtGui.QColor(QtCore.Qt.black)
-color.setAlpha(2)
-painter.setBrush(color)
-painter.setPen(color)
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    'telemetry', nargs='?', default=f'{REFS}/coord.telemetry')
+parser.add_argument('output', nargs='?', default=f'{REFS}/coord.png')
+parser.add_argument('-s', '--start', type=int, help='First tick.')
+parser.add_argument('-e', '--end', type=int, help='Last tick.')
+parser.add_argument(
+    '-c', '--characters', type=int, nargs='+', help='Characters indexes.')
+parser.add_argument(
+    '-st', '--statuses', nargs='+', help='Statuses names (default: not out).')
+parser.add_argument(
+    '-br', '--blur_radius', type=int, default=HEATMAP_BLUR_RADIUS)
+arguments = parser.parse_args()
 
-for point in points:
-    point = QtCore.QPointF(*point)
-    painter.drawEllipse(point, 4, 4)
-
-filepath = f'{os.path.dirname(__file__)}/../refs/coord.png'
-image = image.toImage()
-image.save(filepath)
\ No newline at end of file
+telemetry = Telemetry(arguments.telemetry)
+statuses = arguments.statuses or [
+    status for status in telemetry.statuses if status != 'out']
+records = telemetry.select(
+    arguments.start, arguments.end, arguments.characters, statuses)
+pixels = build_heatmap(records, radius=arguments.blur_radius)
+Image.fromarray(pixels, mode='RGBA').save(arguments.output)
+print(f'{len(records)} records -> {arguments.output}')
@@ -1,41 +1,64 @@
-import pickle
+import numpy as np
 from PySide6 import QtWidgets, QtCore, QtGui
+from pixaloon.telemetry import (
+    Telemetry, build_heatmap, HEATMAP_WIDTH, HEATMAP_HEIGHT)
 
 
 STATUS_COLORS = {
     'autopilot': 'red',
-    'duel_origin': 'yellon',
+    'duel_origin': 'yellow',
     'duel_target': 'yellow',
     'interacting': 'orange',
     'out': 'black',
     'free': 'green',
     'stuck': 'white',
 }
+PILOT_COLOR = 'blue'
 
 
 class HeatmapDisplayWidget(QtWidgets.QWidget):
     def __init__(self, heatmap_path, parent=None):
         super().__init__(parent, QtCore.Qt.Tool)
-        with open(heatmap_path, 'rb') as f:
-            self.heatmap_data = pickle.load(f)
+        self.telemetry = Telemetry(heatmap_path)
 
-        self.heatmap_display = HeatmapDisplay(self.heatmap_data)
+        self.heatmap_display = HeatmapDisplay(self.telemetry)
 
         self.timeline = QtWidgets.QSlider(QtCore.Qt.Horizontal)
-        self.timeline.setMaximum(len(self.heatmap_data) - 1)
+        self.timeline.setRange(
+            self.telemetry.first_tick, self.telemetry.last_tick)
         self.timeline.valueChanged.connect(self.set_frame)
 
         self.all = QtWidgets.QCheckBox('All')
         self.all.toggled.connect(self.check_all)
 
+        self.window = QtWidgets.QSpinBox()
+        self.window.setRange(
+            0, self.telemetry.last_tick - self.telemetry.first_tick)
+        self.window.setSuffix(' ticks')
+        self.window.setSpecialValueText('Whole session')
+        self.window.setToolTip(
+            'Heat map of the ticks preceding the timeline position.')
+        self.window.valueChanged.connect(self.set_window)
+
         self.isolate = QtWidgets.QSlider(QtCore.Qt.Horizontal)
-        self.isolate.setRange(-1, len(self.heatmap_data[0]) - 1)
+        self.isolate.setRange(-1, self.telemetry.characters_count - 1)
         self.isolate.setValue(-1)
         self.isolate.valueChanged.connect(self.isolate_character)
 
+        self.statuses = []
+        statuses_layout = QtWidgets.QHBoxLayout()
+        statuses_layout.setContentsMargins(0, 0, 0, 0)
+        for status in self.telemetry.statuses:
+            checkbox = QtWidgets.QCheckBox(status)
+            checkbox.setChecked(status in self.heatmap_display.statuses)
+            checkbox.toggled.connect(self.filter_statuses)
+            statuses_layout.addWidget(checkbox)
+            self.statuses.append(checkbox)
+
         layout1 = QtWidgets.QHBoxLayout()
         layout1.setContentsMargins(0, 0, 0, 0)
         layout1.addWidget(self.timeline)
+        layout1.addWidget(self.window)
         layout1.addWidget(self.all)
 
         layout = QtWidgets.QVBoxLayout(self)
@@ -44,6 +67,7 @@ class HeatmapDisplayWidget(QtWidgets.QWidget):
         layout.addWidget(self.heatmap_display)
         layout.addLayout(layout1)
         layout.addWidget(self.isolate)
+        layout.addLayout(statuses_layout)
 
     def check_all(self, state):
         self.heatmap_display.all_frames = state
@@ -53,80 +77,110 @@ class HeatmapDisplayWidget(QtWidgets.QWidget):
         self.heatmap_display.frame = frame
         self.heatmap_display.update()
 
+    def set_window(self, value):
+        self.heatmap_display.window = value
+        self.heatmap_display.update()
+
     def isolate_character(self, value):
         self.heatmap_display.isolated_index = value
         self.heatmap_display.update()
 
+    def filter_statuses(self, *_):
+        self.heatmap_display.statuses = {
+            checkbox.text() for checkbox in self.statuses
+            if checkbox.isChecked()}
+        self.heatmap_display.update()
+
 
 class HeatmapDisplay(QtWidgets.QWidget):
-    def __init__(self, heatmap_data, parent=None):
+    def __init__(self, telemetry, parent=None):
         super().__init__(parent=parent)
-        self.data = heatmap_data
-        self.frame = 0
+        self.telemetry = telemetry
+        self.frame = telemetry.first_tick
         self.all_frames = False
-        self.npc_path_pixmaps = {}
+        self.window = 0
         self.isolated_index = -1
+        self.statuses = {s for s in telemetry.statuses if s != 'out'}
+        self.heatmap_key = None
         self.heatmap_pixmap = None
-        self.setFixedSize(640, 360)
+        self.npc_path_key = None
+        self.npc_path_pixmap = None
+        self.setFixedSize(HEATMAP_WIDTH, HEATMAP_HEIGHT)
+
+    def time_range(self):
+        if not self.window:
+            return None, None
+        return self.frame - self.window, self.frame
+
+    def characters(self):
+        return None if self.isolated_index == -1 else [self.isolated_index]
 
     def get_heatmap_pixmap(self):
-        if self.heatmap_pixmap is None:
-            self.heatmap_pixmap = QtGui.QPixmap(QtCore.QSize(640, 360))
-            self.heatmap_pixmap.fill(QtCore.Qt.white)
-            painter = QtGui.QPainter(self.heatmap_pixmap)
-            painter.setPen(QtCore.Qt.NoPen)
-            color = QtGui.QColor(255, 0, 0, 5)
-            painter.setBrush(color)
-            for positions in self.data:
-                for position, status, _ in positions:
-                    if status == 'out':
-                        continue
-                    position = QtCore.QPoint(*position)
-                    painter.drawEllipse(position, 5, 5)
-            painter.end()
+        start, end = self.time_range()
+        key = start, end, self.isolated_index, frozenset(self.statuses)
+        if key == self.heatmap_key:
+            return self.heatmap_pixmap
+        records = self.telemetry.select(
+            start, end, self.characters(), self.statuses)
+        pixels = build_heatmap(records)
+        image = QtGui.QImage(
+            pixels.data, HEATMAP_WIDTH, HEATMAP_HEIGHT, pixels.strides[0],
+            QtGui.QImage.Format_RGBA8888)
+        # fromImage copies the pixels, the array can be released.
+        self.heatmap_pixmap = QtGui.QPixmap.fromImage(image)
+        self.heatmap_key = key
         return self.heatmap_pixmap
 
     def get_npc_paths_pixmap(self, index):
-        pixmap = self.npc_path_pixmaps.get(index)
-        if pixmap:
-            return pixmap
-        pixmap = QtGui.QPixmap(QtCore.QSize(640, 360))
+        start, end = self.time_range()
+        key = start, end, index
+        if key == self.npc_path_key:
+            return self.npc_path_pixmap
+        pixmap = QtGui.QPixmap(QtCore.QSize(HEATMAP_WIDTH, HEATMAP_HEIGHT))
         pixmap.fill(QtCore.Qt.transparent)
         painter = QtGui.QPainter(pixmap)
-        painter.setPen(QtCore.Qt.NoPen)
-        last_point = None
-        for positions in self.data:
-            position, status, freepilot = positions[index]
-            if status == 'out':
-                continue
-            point = QtCore.QPoint(*position)
-            if last_point is None:
-                last_point = point
+        statuses = self.telemetry.statuses
+        records = self.telemetry.select(start, end, [index])
+        records = records[
+            records['status'] != self.telemetry.status_code('out')]
+        # A segment takes the color of its end point. Consecutive segments
+        # of the same color are drawn as one polyline.
+        codes = np.where(records['pilot'], -1, records['status'])
+        points = [
+            QtCore.QPointF(x, y) for x, y in
+            zip(records['x'].tolist(), records['y'].tolist())]
+        bounds = [1, *(np.flatnonzero(np.diff(codes[1:])) + 2), len(codes)]
+        for first, last in zip(bounds, bounds[1:]):
+            if first >= last:
                 continue
-            color = QtGui.QColor(STATUS_COLORS[status] if freepilot else 'blue')
-            painter.setPen(color)
-            painter.drawLine(last_point, point)
-            last_point = point
+            code = int(codes[first])
+            color = (
+                PILOT_COLOR if code == -1 else STATUS_COLORS[statuses[code]])
+            painter.setPen(QtGui.QColor(color))
+            painter.drawPolyline(QtGui.QPolygonF(points[first - 1:last]))
         painter.end()
-        self.npc_path_pixmaps[index] = pixmap
+        self.npc_path_key = key
+        self.npc_path_pixmap = pixmap
         return pixmap
 
     def paintEvent(self, event):
         painter = QtGui.QPainter(self)
         painter.drawRect(self.rect())
-        if self.all_frames and self.isolated_index == -1:
+        if self.all_frames:
             painter.drawPixmap(self.rect(), self.get_heatmap_pixmap())
-            return
-        elif self.all_frames:
-            pixmap = self.get_npc_paths_pixmap(self.isolated_index)
-            painter.drawPixmap(self.rect(), pixmap)
+            if self.isolated_index != -1:
+                pixmap = self.get_npc_paths_pixmap(self.isolated_index)
+                painter.drawPixmap(self.rect(), pixmap)
         else:
-            positions = self.data[self.frame]
-            for position, status, freepilot in positions:
+            statuses = self.telemetry.statuses
+            records = self.telemetry.select(
+                self.frame, self.frame, self.characters(), self.statuses)
+            for x, y, status, pilot in zip(
+                    records['x'].tolist(), records['y'].tolist(),
+                    records['status'].tolist(), records['pilot'].tolist()):
                 color = QtGui.QColor(
-                    (STATUS_COLORS[status] if freepilot else 'blue'))
+                    PILOT_COLOR if pilot else STATUS_COLORS[statuses[status]])
                 painter.setPen(color)
-                point = QtCore.QPoint(*position)
-                painter.drawEllipse(point, 2, 2)
+                painter.drawEllipse(QtCore.QPointF(x, y), 2, 2)
         painter.end()
-        return super().paintEvent(event)
\ No newline at end of file
+        return super().paintEvent(event)
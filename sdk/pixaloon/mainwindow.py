@@ -394,7 +394,7 @@ class Pixaloon(QtWidgets.QMainWindow):
 
     def open_hitmap_display(self):
         filepath, _ = QtWidgets.QFileDialog.getOpenFileName(
-            self, 'Open heat map file', filter='*.pkl')
+            self, 'Open heat map file', filter='*.telemetry')
         if not filepath:
             return
         window = HeatmapDisplayWidget(filepath, self)
@@ -466,7 +466,7 @@ class RunGameDialog(QtWidgets.QDialog):
 
     def select_file(self):
         filepath, _ = QtWidgets.QFileDialog.getSaveFileName(
-            self, 'Record path', self.document.gameroot, filter='*.pkl')
+            self, 'Record path', self.document.gameroot, filter='*.telemetry')
         if not filepath:
             return
         self.replay_path.setText(filepath)
@@ -0,0 +1,164 @@
+import os
+import json
+from functools import cached_property
+import numpy as np
+
+
+# Mirrors ragtimerumble.telemetry which can't be imported from the sdk.
+TELEMETRY_FORMAT = 'ragtimerumble-telemetry'
+TELEMETRY_HEADER_SIZE = 1024
+
+HEATMAP_WIDTH = 640
+HEATMAP_HEIGHT = 360
+HEATMAP_BLUR_RADIUS = 5
+# Colors stops as (heat, (r, g, b, a)), the heat is normalized on 0-1.
+HEATMAP_GRADIENT = (
+    (0.0, (255, 255, 255, 255)),
+    (0.2, (255, 240, 120, 255)),
+    (0.5, (255, 140, 0, 255)),
+    (0.8, (220, 20, 0, 255)),
+    (1.0, (110, 0, 0, 255)))
+HEATMAP_GAMMA = .5
+
+
+class Telemetry:
+    """
+    Telemetry file recorded by the game (--record_replay_filepath). The
+    records are memory-mapped: opening a multi-hours recording is instant
+    and only the pages read are loaded.
+    """
+
+    def __init__(self, filepath):
+        with open(filepath, 'rb') as f:
+            header = json.loads(f.read(TELEMETRY_HEADER_SIZE))
+        if header.get('format') != TELEMETRY_FORMAT:
+            raise ValueError(f'{filepath} is not a telemetry file')
+        self.statuses = header['statuses']
+        dtype = np.dtype([tuple(field) for field in header['dtype']])
+        # A recording interrupted by a crash can end with a partial record.
+        size = os.path.getsize(filepath) - TELEMETRY_HEADER_SIZE
+        length = size // dtype.itemsize
+        if length:
+            self.records = np.memmap(
+                filepath, dtype=dtype, mode='r',
+                offset=TELEMETRY_HEADER_SIZE, shape=(length,))
+        else:
+            self.records = np.zeros(0, dtype=dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def first_tick(self):
+        return int(self.records['tick'][0]) if len(self.records) else 0
+
+    @property
+    def last_tick(self):
+        return int(self.records['tick'][-1]) if len(self.records) else 0
+
+    @cached_property
+    def characters_count(self):
+        """
+        Characters can be added or removed during the recording: the whole
+        file is scanned, once.
+        """
+        if not len(self.records):
+            return 0
+        return int(self.records['character'].max()) + 1
+
+    def status_code(self, status):
+        return self.statuses.index(status)
+
+    def tick_records(self, tick):
+        """
+        Records are written in tick order, a tick is found by dichotomy.
+        """
+        ticks = self.records['tick']
+        start = np.searchsorted(ticks, tick, side='left')
+        end = np.searchsorted(ticks, tick, side='right')
+        return self.records[start:end]
+
+    def character_records(self, index):
+        return self.records[self.records['character'] == index]
+
+    def select(self, start=None, end=None, characters=None, statuses=None):
+        """
+        Records from tick start to tick end (both included), optionally
+        filtered on characters indexes and statuses names.
+        """
+        ticks = self.records['tick']
+        first = 0 if start is None else np.searchsorted(ticks, start, 'left')
+        last = (
+            len(ticks) if end is None else
+            np.searchsorted(ticks, end, 'right'))
+        records = self.records[first:last]
+        if characters is not None:
+            records = records[np.isin(records['character'], list(characters))]
+        if statuses is not None:
+            codes = [self.status_code(status) for status in statuses]
+            records = records[np.isin(records['status'], codes)]
+        return records
+
+
+def accumulate_heatmap(records, width=HEATMAP_WIDTH, height=HEATMAP_HEIGHT):
+    """
+    Count the records per pixel as a (height, width) array.
+    """
+    x = np.floor(records['x']).astype(np.int64)
+    y = np.floor(records['y']).astype(np.int64)
+    inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+    indexes = y[inside] * width + x[inside]
+    counts = np.bincount(indexes, minlength=width * height)
+    return counts.reshape(height, width).astype(np.float32)
+
+
+def _convolve_rows(image, kernel):
+    radius = len(kernel) // 2
+    width = image.shape[1]
+    padded = np.pad(image, ((0, 0), (radius, radius)))
+    result = np.zeros_like(image)
+    for offset, weight in enumerate(kernel):
+        result += weight * padded[:, offset:offset + width]
+    return result
+
+
+def blur_heatmap(heatmap, radius=HEATMAP_BLUR_RADIUS):
+    """
+    Separable gaussian blur, the cost depends on the radius, not on the
+    records count.
+    """
+    if radius <= 0:
+        return heatmap
+    offsets = np.arange(-radius, radius + 1, dtype=np.float32)
+    kernel = np.exp(-.5 * (offsets / (radius / 2)) ** 2)
+    kernel /= kernel.sum()
+    heatmap = _convolve_rows(heatmap, kernel)
+    return _convolve_rows(heatmap.T, kernel).T
+
+
+def colorize_heatmap(
+        heatmap, gradient=HEATMAP_GRADIENT, gamma=HEATMAP_GAMMA):
+    """
+    Map the heat through the gradient as a (height, width, 4) RGBA uint8
+    array. The gamma lifts the sparse areas which would barely show with the
+    busiest spots as maximum.
+    """
+    stops = [stop for stop, _ in gradient]
+    colors = np.array([color for _, color in gradient], dtype=np.float32)
+    steps = np.linspace(0, 1, 256)
+    lut = np.stack(
+        [np.interp(steps, stops, colors[:, i]) for i in range(4)], axis=-1)
+    lut = lut.round().astype(np.uint8)
+    maximum = heatmap.max()
+    if maximum <= 0:
+        heat = np.zeros(heatmap.shape, dtype=np.uint8)
+    else:
+        heat = ((heatmap / maximum) ** gamma * 255).astype(np.uint8)
+    return np.ascontiguousarray(lut[heat])
+
+
+def build_heatmap(
+        records, width=HEATMAP_WIDTH, height=HEATMAP_HEIGHT,
+        radius=HEATMAP_BLUR_RADIUS):
+    heatmap = accumulate_heatmap(records, width, height)
+    return colorize_heatmap(blur_heatmap(heatmap, radius))
@@ -1,6 +1,8 @@
 import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+# The palette swap is shared with the game (ragtimerumble.palette).
+sys.path.append(f'{os.path.dirname(__file__)}/../../../ragtimerumble')
 
 from PySide6 import QtWidgets
 from pixoleros.mainwindow import Pixoleros
@@ -1,9 +1,11 @@
+import sys
 import math
 import colorsys
 import numpy as np
 from PIL import Image, ImageQt
 from collections import Counter
 from PySide6 import QtGui, QtCore
+from ragtimerumble.palette import remap_packed_colors
 
 
 def remove_key_color(filename):
@@ -16,16 +18,17 @@ def remove_key_color(filename):
 
 
 def switch_colors(image, palette1, palette2):
+    """
+    Same palette swap as the game skins (ragtimerumble.palette).
+    """
     data = np.array(image)
-    # Temporarily unpack the bands for readability
-    red, green, blue, _ = data.T
-    for color1, color2 in zip(palette1, palette2):
-        if color1 == color2:
-            continue
-        # Replace white with red... (leaves alpha values alone...)
-        areas = (red == color1[0]) & (blue == color1[2]) & (green == color1[1])
-        data[..., :-1][areas.T] = color2  # Transpose back needed
-        # data[(data == color1).all(axis=-1)] = color2
+    # RGBA bytes seen as one uint32 per pixel.
+    packed = data.view(np.uint32)[..., 0]
+    if sys.byteorder == 'little':
+        shifts = 0, 8, 16
+    else:
+        shifts = 24, 16, 8
+    remap_packed_colors(packed, palette1, palette2, shifts)
     return Image.fromarray(data, mode='RGBA')
 
 
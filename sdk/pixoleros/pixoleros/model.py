@@ -5,11 +5,15 @@ import platform
 import itertools
 from PySide6 import QtGui, QtCore
 from copy import deepcopy
+from functools import lru_cache
 from pixoleros.io import serialize_document, bytes_to_image
 from pixoleros.imgutils import remove_key_color
 from pixoleros.template import EMPTY_ANIMDATA
 
 
+EXPOSURES_TABLES_CACHE_SIZE = 256
+
+
 class Document:
     def __init__(self, data):
         self.data = deepcopy(data)
@@ -246,13 +250,24 @@ def frame_index_from_exposures(index, exposures):
         index = 3 -> 6
         index = 8 -> 3
     """
-    loop = 0
-    for i, d in enumerate(exposures):
-        for _ in range(d):
-            if index == loop:
-                return i
-            loop += 1
-    return 0
+    table = exposures_table(exposures)
+    return table[index] if 0 <= index < len(table) else 0
+
+
+def exposures_table(exposures):
+    """
+    Tick to frame table, the same as the game's one. Tables are cached by
+    exposures values, an edited animation gets a new one. The cache is
+    bounded: the tables of the former exposures are dropped while editing.
+    """
+    return _build_exposures_table(tuple(exposures))
+
+
+@lru_cache(maxsize=EXPOSURES_TABLES_CACHE_SIZE)
+def _build_exposures_table(exposures):
+    return tuple(
+        i for i, exposure in enumerate(exposures)
+        for _ in range(exposure))
 
 
 class PixoImage: